@@ -0,0 +1,3310 @@
+import heapq
+import threading
+import time
+import sys
+import json
+import os
+import random # Added for randomization
+import math
+import struct
+from array import array
+from bisect import bisect_left
+from collections import deque, namedtuple
+from functools import lru_cache
+from itertools import accumulate, islice
+
+SEQUENCE_FILENAME = "beep_sequence.json"
+BINARY_SEQUENCE_FILENAME = "beep_sequence.beeps"
+LIBRARY_FILENAME = "beep_library.db"
+LIBRARY_LIST_LIMIT = 20 # Sequences the menu lists before asking for a filter
+DAEMON_SOCKET = "beep_daemon.sock"
+
+# Morse Code Dictionary for commonly used characters
+MORSE_CODE = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..',
+    '0': '-----', '1': '.----', '2': '..---', '3': '...--', '4': '....-',
+    '5': '.....', '6': '-....', '7': '--...', '8': '---..', '9': '----.',
+    '.': '.-.-.-', ',': '--..--', '?': '..--..', '/': '-..-.', '-': '-....-',
+    '(': '-.--.', ')': '-.--.-', "'": '.----.', ':': '---...', ';': '-.-.-.',
+    '=': '-...-', '+': '.-.-.', '"': '.-..-.', '@': '.--.-.', '&': '.-...',
+    '_': '..--.-', '!': '-.-.--', '$': '...-..-',
+    ' ': ' ' # Space is handled separately
+}
+
+# Procedural signals, sent as one run-together character and written <AR> in text
+MORSE_PROSIGNS = {
+    'AR': '.-.-.', 'AS': '.-...', 'BT': '-...-', 'CT': '-.-.-', 'HH': '........',
+    'KN': '-.--.', 'SK': '...-.-', 'SN': '...-.', 'SOS': '...---...',
+}
+
+# Paris standard timing in dot units (T = 1.2 / WPM seconds)
+UNITS_DOT = 1
+UNITS_DASH = 3
+UNITS_ELEMENT_GAP = 1  # Gap between dots/dashes within a letter
+UNITS_CHAR_GAP = 3     # Gap between letters
+UNITS_WORD_GAP = 7     # Gap between words
+
+# How many compiled (text, wpm) plans to keep around for repeated messages
+MORSE_PLAN_CACHE_SIZE = 128
+
+def get_valid_float(prompt, min_val=0.0):
+    """Helper function to get a validated float input."""
+    while True:
+        try:
+            value = float(input(prompt))
+            if value < min_val:
+                print(f"Value must be {min_val} or greater.")
+                continue
+            return value
+        except ValueError:
+            print("Invalid input. Please enter a number (e.g., 0.5 or 2).")
+
+def get_valid_int(prompt, min_val=1):
+    """Helper function to get a validated integer input."""
+    while True:
+        try:
+            value = int(input(prompt))
+            if value < min_val:
+                print(f"Value must be a whole number, {min_val} or greater.")
+                continue
+            return value
+        except ValueError:
+            print("Invalid input. Please enter a whole number.")
+
+# --- Sequence Model ---
+
+FALLBACK_DELAY = 0.5 # Used for any delays missing from older sequence files
+MAX_FALLBACK_DELAYS = 100000 # More missing delays than this means a corrupt file, not an old one
+
+# Define reasonable ranges for randomization
+MIN_BEATS = 3
+MAX_BEATS = 15
+MIN_TIME = 0.1
+MAX_TIME = 5.0
+
+class Sequence:
+    """
+    An immutable beep sequence, validated once when it is created.
+    Delays are held as a read-only float64 buffer (zero-copy when built from a
+    mapped binary file), and fire_times holds the offset of every beep from the
+    start of playback, so any position can be found with a binary search.
+    """
+    __slots__ = ("initial_wait", "num_beeps", "delays", "fire_times")
+
+    def __init__(self, initial_wait=0.0, num_beeps=0, delays=()):
+        try:
+            initial_wait = float(initial_wait)
+        except (TypeError, ValueError):
+            raise ValueError(f"Initial wait must be a non-negative number, got {initial_wait!r}.") from None
+        if not math.isfinite(initial_wait) or initial_wait < 0:
+            raise ValueError(f"Initial wait must be a non-negative number, got {initial_wait}.")
+        if isinstance(num_beeps, float) and num_beeps.is_integer():
+            num_beeps = int(num_beeps)
+        if not isinstance(num_beeps, int) or isinstance(num_beeps, bool) or num_beeps < 0:
+            raise ValueError(f"Number of beeps must be a non-negative whole number, got {num_beeps!r}.")
+
+        # Keep a float64 buffer as-is; anything else is packed into one
+        if isinstance(delays, memoryview) and delays.format == 'd':
+            buffer = delays
+        else:
+            try:
+                buffer = memoryview(array('d', delays))
+            except (TypeError, ValueError):
+                raise ValueError(f"Delays must be a list of numbers, got {delays!r:.60}.") from None
+
+        needed = max(num_beeps - 1, 0)
+        if len(buffer) > needed:
+            buffer = buffer[:needed]
+        elif len(buffer) < needed:
+            if needed - len(buffer) > MAX_FALLBACK_DELAYS:
+                raise ValueError(f"{num_beeps} beeps but only {len(buffer)} delays.")
+            padded = array('d', buffer)
+            padded.extend([FALLBACK_DELAY] * (needed - len(buffer)))
+            buffer = memoryview(padded)
+
+        if not all(map(math.isfinite, buffer)) or (needed and min(buffer) < 0):
+            raise ValueError("Delays must be non-negative numbers.")
+
+        fire_times = array('d', accumulate(buffer, initial=initial_wait)) if num_beeps else array('d')
+
+        set_slot = object.__setattr__
+        set_slot(self, "initial_wait", initial_wait)
+        set_slot(self, "num_beeps", num_beeps)
+        set_slot(self, "delays", buffer.toreadonly())
+        set_slot(self, "fire_times", memoryview(fire_times).toreadonly())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Sequence is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Sequence is immutable.")
+
+    def __repr__(self):
+        return f"Sequence(initial_wait={self.initial_wait}, num_beeps={self.num_beeps}, total={self.total:.3f}s)"
+
+    @property
+    def total(self):
+        """Seconds from the start of playback to the last beep."""
+        return self.fire_times[-1] if self.num_beeps else self.initial_wait
+
+    def index_at(self, position):
+        """Index of the first beep firing at or after position (seconds), or num_beeps if none."""
+        return bisect_left(self.fire_times, position)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a Sequence from the JSON/dict layout. Raises ValueError if it is invalid."""
+        if not isinstance(data, dict):
+            raise ValueError("A sequence must be a JSON object.")
+        return cls(data.get("initial_wait", 0.0), data.get("num_beeps", 0), data.get("delays", ()))
+
+    def to_dict(self):
+        return {
+            "initial_wait": self.initial_wait,
+            "num_beeps": self.num_beeps,
+            "delays": self.delays.tolist(),
+        }
+
+def as_sequence(sequence):
+    """Accepts a Sequence or a sequence dict and returns a Sequence."""
+    if isinstance(sequence, Sequence):
+        return sequence
+    return Sequence.from_dict(sequence)
+
+def create_new_sequence():
+    """Interactively creates a new beep sequence configuration."""
+    print("\n--- 1. CREATE NEW SEQUENCE ---")
+    
+    # 1. Initial Wait
+    initial_wait = get_valid_float(
+        "Enter wait time BEFORE the first beep (seconds, e.g., 2.0): "
+    )
+
+    # 2. Number of Beeps
+    num_beeps = get_valid_int(
+        "Enter the TOTAL number of beeps in the sequence (e.g., 5): "
+    )
+    
+    delays = []
+    if num_beeps > 1:
+        print(f"\nNow enter the {num_beeps - 1} individual delays between the beeps:")
+        for i in range(num_beeps - 1):
+            delay = get_valid_float(
+                f"  Delay between beep {i+1} and beep {i+2} (seconds): "
+            )
+            delays.append(delay)
+    
+    sequence = Sequence(initial_wait, num_beeps, delays)
+    
+    print("\nSequence created successfully.")
+    print(f"Beeps: {num_beeps}. Initial Wait: {initial_wait}s. Delays: {delays}")
+    return sequence
+
+def create_random_sequence():
+    """Generates a completely random beep sequence configuration."""
+    print("\n--- 5. CREATE RANDOM SEQUENCE (SURPRISE!) ---")
+
+    # 1. Random Initial Wait (rounded to two decimals for cleaner data)
+    initial_wait = round(random.uniform(MIN_TIME, MAX_TIME), 2)
+
+    # 2. Random Number of Beeps
+    num_beeps = random.randint(MIN_BEATS, MAX_BEATS)
+    
+    delays = []
+    if num_beeps > 1:
+        for i in range(num_beeps - 1):
+            # Random delay for each segment
+            delay = round(random.uniform(MIN_TIME, MAX_TIME), 2)
+            delays.append(delay)
+    
+    sequence = Sequence(initial_wait, num_beeps, delays)
+    
+    # Only report the count, keeping the timing secret, as requested
+    print(f"\nRandom sequence created with {num_beeps} beeps. Get ready for a surprise!")
+    return sequence
+
+
+def save_sequence(sequence):
+    """Saves the sequence to the predefined JSON file."""
+    if not sequence:
+        print("\nError: Cannot save. Please create a sequence first.")
+        return
+
+    try:
+        with open(SEQUENCE_FILENAME, 'w') as f:
+            json.dump(as_sequence(sequence).to_dict(), f, indent=4)
+        print(f"\nSequence saved to {SEQUENCE_FILENAME}")
+    except Exception as e:
+        print(f"\nError saving file: {e}")
+
+def load_sequence():
+    """Loads the sequence from the predefined JSON file."""
+    if not os.path.exists(SEQUENCE_FILENAME):
+        print(f"\nError: File '{SEQUENCE_FILENAME}' not found. Please create and save a sequence first.")
+        return None
+    
+    try:
+        with open(SEQUENCE_FILENAME, 'r') as f:
+            sequence = Sequence.from_dict(json.load(f))
+            print(f"\nSequence loaded from {SEQUENCE_FILENAME}:")
+            print(f"Beeps: {sequence.num_beeps}. Initial Wait: {sequence.initial_wait}s.")
+            return sequence
+    except json.JSONDecodeError:
+        print(f"\nError: File '{SEQUENCE_FILENAME}' contains invalid JSON data.")
+        return None
+    except ValueError as e:
+        print(f"\nError: File '{SEQUENCE_FILENAME}' is not a valid sequence: {e}")
+        return None
+    except Exception as e:
+        print(f"\nError loading file: {e}")
+        return None
+
+# --- Binary Sequence Format ---
+#
+# Little-endian header followed by the delays as packed float64:
+#   magic "BEEP" | version u16 | reserved u16 | initial_wait f64 | num_beeps u64 | delay count u64
+# The header is 32 bytes, so the delays array starts 8-byte aligned.
+
+BINARY_MAGIC = b"BEEP"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHHdQQ")
+
+def pack_delays(delays):
+    """Packs delays as little-endian float64 bytes."""
+    packed = array('d', delays)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+def unpack_delays(data):
+    """Unpacks little-endian float64 bytes into an array('d')."""
+    delays = array('d')
+    delays.frombytes(data)
+    if sys.byteorder != 'little':
+        delays.byteswap()
+    return delays
+
+def save_sequence_binary(sequence, path=BINARY_SEQUENCE_FILENAME):
+    """Writes a sequence in the binary format."""
+    sequence = as_sequence(sequence)
+    delays = pack_delays(sequence.delays)
+    with open(path, 'wb') as f:
+        f.write(BINARY_HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, 0,
+            sequence.initial_wait,
+            sequence.num_beeps,
+            len(delays) // 8,
+        ))
+        f.write(delays)
+
+def load_sequence_binary(path=BINARY_SEQUENCE_FILENAME):
+    """
+    Maps a binary sequence file into memory and returns it as a Sequence whose
+    delays are a read-only float64 view straight onto the mapped file, so
+    nothing is parsed or copied however long the sequence is.
+    Raises ValueError if the file is not a valid sequence.
+    """
+    import mmap
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < BINARY_HEADER.size:
+            raise ValueError(f"'{path}' is too short to be a binary sequence.")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return parse_sequence_binary(mapped, path)
+
+def parse_sequence_binary(buffer, source="<buffer>"):
+    """Builds a Sequence over any buffer in the binary format, without copying the delays."""
+    if len(buffer) < BINARY_HEADER.size:
+        raise ValueError(f"'{source}' is too short to be a binary sequence.")
+    magic, version, _, initial_wait, num_beeps, count = BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"'{source}' is not a binary sequence file.")
+    if version != BINARY_VERSION:
+        raise ValueError(f"'{source}' uses unsupported format version {version}.")
+    end = BINARY_HEADER.size + 8 * count
+    if len(buffer) < end:
+        raise ValueError(f"'{source}' is truncated ({count} delays expected).")
+
+    delays = memoryview(buffer)[BINARY_HEADER.size:end].cast('d')
+    if sys.byteorder != 'little':
+        # Zero-copy only works on little-endian hosts
+        delays = memoryview(unpack_delays(delays))
+
+    return Sequence(initial_wait, num_beeps, delays)
+
+def is_binary_sequence(path):
+    """Checks whether a file starts with the binary sequence magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def read_sequence_file(path):
+    """
+    Loads a sequence from a JSON or binary file, or from stdin when path is
+    '-'. The format is detected from the content, not the file name.
+    """
+    if path == '-':
+        data = sys.stdin.buffer.read()
+        if data.startswith(BINARY_MAGIC):
+            return parse_sequence_binary(data, "<stdin>")
+        return Sequence.from_dict(json.loads(data))
+    if is_binary_sequence(path):
+        return load_sequence_binary(path)
+    with open(path, 'r') as f:
+        return Sequence.from_dict(json.loads(f.read()))
+
+def json_to_binary(json_path=SEQUENCE_FILENAME, binary_path=BINARY_SEQUENCE_FILENAME):
+    """Converts a JSON sequence file to the binary format."""
+    with open(json_path, 'r') as f:
+        sequence = Sequence.from_dict(json.load(f))
+    save_sequence_binary(sequence, binary_path)
+    return sequence.num_beeps
+
+def binary_to_json(binary_path=BINARY_SEQUENCE_FILENAME, json_path=SEQUENCE_FILENAME):
+    """Converts a binary sequence file back to indented JSON."""
+    sequence = load_sequence_binary(binary_path)
+    with open(json_path, 'w') as f:
+        json.dump(sequence.to_dict(), f, indent=4)
+    return sequence.num_beeps
+
+# --- Sequence Library ---
+
+LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sequences (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    initial_wait REAL NOT NULL,
+    num_beeps INTEGER NOT NULL,
+    delay_count INTEGER NOT NULL,
+    total_seconds REAL NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    delays BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT NOT NULL,
+    sequence_id INTEGER NOT NULL REFERENCES sequences(id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, sequence_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tags_by_sequence ON tags(sequence_id);
+"""
+
+# Everything about a stored sequence except its delays
+SequenceInfo = namedtuple(
+    "SequenceInfo", "name initial_wait num_beeps delay_count total_seconds tags updated"
+)
+
+class SequenceLibrary:
+    """
+    Named, tagged sequences in a single SQLite file. Names are unique and
+    indexed, tags live in their own indexed table, and delays are stored as
+    a packed float64 blob that is only read when a sequence is loaded.
+    """
+
+    def __init__(self, path=LIBRARY_FILENAME):
+        import sqlite3
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(LIBRARY_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self, name, sequence, tags=None):
+        """
+        Inserts or updates the named sequence. Tags are replaced when given
+        and left alone when tags is None.
+        """
+        self.save_many([(name, sequence)], tags)
+
+    def save_many(self, items, tags=None):
+        """Like save(), for an iterable of (name, sequence) pairs in one transaction."""
+        now = time.time()
+        with self.db:
+            for name, sequence in items:
+                self._save_one(name, as_sequence(sequence), tags, now)
+
+    def _save_one(self, name, sequence, tags, now):
+        self.db.execute(
+            """INSERT INTO sequences
+                   (name, initial_wait, num_beeps, delay_count, total_seconds, created, updated, delays)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(name) DO UPDATE SET
+                   initial_wait = excluded.initial_wait,
+                   num_beeps = excluded.num_beeps,
+                   delay_count = excluded.delay_count,
+                   total_seconds = excluded.total_seconds,
+                   updated = excluded.updated,
+                   delays = excluded.delays""",
+            (name, sequence.initial_wait, sequence.num_beeps, len(sequence.delays),
+             sequence.total, now, now, pack_delays(sequence.delays)),
+        )
+        if tags is not None:
+            (sequence_id,) = self.db.execute(
+                "SELECT id FROM sequences WHERE name = ?", (name,)
+            ).fetchone()
+            self.db.execute("DELETE FROM tags WHERE sequence_id = ?", (sequence_id,))
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tags (tag, sequence_id) VALUES (?, ?)",
+                ((tag, sequence_id) for tag in tags),
+            )
+
+    def load(self, name):
+        """Returns the named Sequence, or None if there is none."""
+        row = self.db.execute(
+            "SELECT initial_wait, num_beeps, delays FROM sequences WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        initial_wait, num_beeps, delays = row
+        return Sequence(initial_wait, num_beeps, unpack_delays(delays))
+
+    def delete(self, name):
+        """Removes the named sequence. Returns whether it existed."""
+        with self.db:
+            return self.db.execute("DELETE FROM sequences WHERE name = ?", (name,)).rowcount > 0
+
+    def list(self, tag=None, prefix=None, limit=None):
+        """
+        Lists stored sequences by name, without their delays: optionally only
+        those with a tag or a name prefix, and at most limit of them.
+        """
+        query = """SELECT s.name, s.initial_wait, s.num_beeps, s.delay_count, s.total_seconds,
+                          (SELECT group_concat(t.tag, ',') FROM tags t WHERE t.sequence_id = s.id),
+                          s.updated
+                   FROM sequences s"""
+        params = []
+        if tag is not None:
+            query += " JOIN tags f ON f.sequence_id = s.id AND f.tag = ?"
+            params.append(tag)
+        if prefix:
+            # A range on the name index: everything from prefix up to the next possible prefix
+            query += " WHERE s.name >= ? AND s.name < ?"
+            params += [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        query += " ORDER BY s.name"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [
+            SequenceInfo(*row[:5], tuple(sorted(row[5].split(','))) if row[5] else (), row[6])
+            for row in self.db.execute(query, params)
+        ]
+
+def save_to_library(sequence):
+    """Interactively saves the current sequence into the library under a name."""
+    if not sequence:
+        print("\nError: Cannot save. Please create a sequence first.")
+        return
+
+    name = input("Enter a name for this sequence: ").strip()
+    if not name:
+        print("\nError: A name is required.")
+        return
+    tags = [tag.strip() for tag in input("Tags (comma separated, optional): ").split(',') if tag.strip()]
+
+    try:
+        with SequenceLibrary() as library:
+            library.save(name, sequence, tags)
+        print(f"\nSequence '{name}' saved to {LIBRARY_FILENAME}")
+    except Exception as e:
+        print(f"\nError saving to library: {e}")
+
+def load_from_library():
+    """
+    Interactively lists the library and loads a sequence by name. Large
+    libraries are filtered by name prefix and listed LIBRARY_LIST_LIMIT at a time.
+    """
+    if not os.path.exists(LIBRARY_FILENAME):
+        print(f"\nNo library yet ({LIBRARY_FILENAME}); loading {SEQUENCE_FILENAME} instead.")
+        return load_sequence()
+
+    try:
+        with SequenceLibrary() as library:
+            prefix = None
+            entries = library.list(limit=LIBRARY_LIST_LIMIT + 1)
+            if len(entries) > LIBRARY_LIST_LIMIT:
+                prefix = input("\nThe library is large. Show names starting with (Enter for the first few): ").strip()
+                entries = library.list(prefix=prefix, limit=LIBRARY_LIST_LIMIT + 1)
+            if entries:
+                print(f"\nSequences in {LIBRARY_FILENAME}:")
+                for info in entries[:LIBRARY_LIST_LIMIT]:
+                    tags = f" [{', '.join(info.tags)}]" if info.tags else ""
+                    print(f"  {info.name}: {info.num_beeps} beeps, {info.total_seconds:.2f}s{tags}")
+                if len(entries) > LIBRARY_LIST_LIMIT:
+                    print("  ... and more (use 'list --prefix' on the command line to see them all)")
+            elif prefix:
+                print(f"\nNo sequences starting with '{prefix}'.")
+            else:
+                print(f"\nThe library ({LIBRARY_FILENAME}) is empty.")
+
+            name = input(f"\nName to load (or press Enter to load {SEQUENCE_FILENAME}): ").strip()
+            if not name:
+                return load_sequence()
+
+            sequence = library.load(name)
+    except Exception as e:
+        print(f"\nError loading from library: {e}")
+        return None
+
+    if sequence is None:
+        print(f"\nError: No sequence named '{name}' in the library.")
+        return None
+    print(f"\nSequence '{name}' loaded from {LIBRARY_FILENAME}:")
+    print(f"Beeps: {sequence.num_beeps}. Initial Wait: {sequence.initial_wait}s.")
+    return sequence
+
+# --- Bulk Random Generation ---
+
+RANDOM_BLOCK_SIZE = 10000     # Sequences drawn per vectorized block; part of what a seed produces
+RANDOM_BATCH_SIZE = 10000     # Generated sequences saved per library transaction
+
+# Distributions are (name, *parameters); every draw is clipped at zero
+DISTRIBUTIONS = {"uniform": 2, "normal": 2, "exponential": 1, "lognormal": 2}   # Name -> parameter count
+DEFAULT_WAIT_DISTRIBUTION = ("uniform", MIN_TIME, MAX_TIME)
+DEFAULT_DELAY_DISTRIBUTION = ("uniform", MIN_TIME, MAX_TIME)
+
+def _draw(rng, distribution, size):
+    """Draws size values from a ("uniform", low, high), ("normal", mean, std),
+    ("exponential", mean) or ("lognormal", mean, sigma) distribution."""
+    np = _numpy()
+    name, *params = distribution
+    if name not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{name}'.")
+    if len(params) != DISTRIBUTIONS[name]:
+        raise ValueError(f"Distribution '{name}' takes {DISTRIBUTIONS[name]} parameter(s).")
+    if name == "uniform":
+        values = rng.uniform(params[0], params[1], size)
+    elif name == "normal":
+        values = rng.normal(params[0], params[1], size)
+    elif name == "exponential":
+        values = rng.exponential(params[0], size)
+    else:
+        values = rng.lognormal(params[0], params[1], size)
+    return np.maximum(values, 0.0)
+
+def generate_random_sequences(count, seed, beats=(MIN_BEATS, MAX_BEATS),
+                              wait=DEFAULT_WAIT_DISTRIBUTION, delay=DEFAULT_DELAY_DISTRIBUTION,
+                              decimals=2):
+    """
+    Lazily yields count random Sequences. Beep counts, waits and delays are
+    drawn a block of RANDOM_BLOCK_SIZE sequences at a time, and each block has
+    its own generator seeded from (seed, block number). The block size is
+    fixed, so the same seed always gives exactly the same sequences, however
+    callers group them. decimals=None keeps full precision.
+    """
+    np = _numpy()
+    for block, first in enumerate(range(0, count, RANDOM_BLOCK_SIZE)):
+        size = min(RANDOM_BLOCK_SIZE, count - first)
+        rng = np.random.default_rng([seed, block])
+
+        num_beeps = rng.integers(beats[0], beats[1], size, endpoint=True)
+        waits = _draw(rng, wait, size)
+        delays = _draw(rng, delay, int(np.maximum(num_beeps - 1, 0).sum()))
+        if decimals is not None:
+            waits = waits.round(decimals)
+            delays = delays.round(decimals)
+
+        # Each sequence's delays are a zero-copy slice of the block's array
+        ends = np.cumsum(np.maximum(num_beeps - 1, 0))
+        begin = 0
+        for i, end in enumerate(ends.tolist()):
+            yield Sequence(float(waits[i]), int(num_beeps[i]), memoryview(delays[begin:end]))
+            begin = end
+
+def generate_to_library(library, count, seed, prefix="random-", tags=("random",),
+                        batch_size=RANDOM_BATCH_SIZE, **options):
+    """
+    Streams generated sequences into a SequenceLibrary, one transaction per
+    batch_size sequences. The batch size does not affect what is generated.
+    """
+    width = len(str(max(count - 1, 0)))
+    sequences = enumerate(generate_random_sequences(count, seed, **options))
+    while True:
+        batch = [(f"{prefix}{i:0{width}d}", sequence) for i, sequence in islice(sequences, batch_size)]
+        if not batch:
+            return
+        library.save_many(batch, tags)
+
+def generate_to_binary(directory, count, seed, prefix="random-", **options):
+    """Streams generated sequences into binary sequence files in directory."""
+    os.makedirs(directory, exist_ok=True)
+    width = len(str(max(count - 1, 0)))
+    for i, sequence in enumerate(generate_random_sequences(count, seed, **options)):
+        save_sequence_binary(sequence, os.path.join(directory, f"{prefix}{i:0{width}d}.beeps"))
+
+
+# --- Playback Telemetry ---
+
+# Upper bounds (seconds) of the lateness histogram buckets; the last bucket is open-ended
+LATENESS_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+MISSED_DEADLINE = 0.005       # Firing later than this counts as a missed deadline
+TELEMETRY_DUMP_INTERVAL = 10.0
+
+class PlaybackTelemetry:
+    """
+    Always-on counters for playback: a histogram of how late each event fired
+    against its deadline, missed deadlines, and time spent sleeping versus in
+    output/logging. record() is a bisect and a few additions under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dumper = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histogram = [0] * (len(LATENESS_BUCKETS) + 1)
+            self.events = 0
+            self.missed = 0
+            self.total_lateness = 0.0
+            self.max_lateness = 0.0
+            self.sleep_seconds = 0.0
+            self.io_seconds = 0.0
+
+    def record(self, lateness, sleep_seconds=0.0, io_seconds=0.0):
+        """Counts one fired event. Early events (negative lateness) count as on time."""
+        lateness = max(lateness, 0.0)
+        with self._lock:
+            self.histogram[bisect_left(LATENESS_BUCKETS, lateness)] += 1
+            self.events += 1
+            if lateness > MISSED_DEADLINE:
+                self.missed += 1
+            self.total_lateness += lateness
+            if lateness > self.max_lateness:
+                self.max_lateness = lateness
+            self.sleep_seconds += sleep_seconds
+            self.io_seconds += io_seconds
+
+    def add_sleep(self, seconds):
+        with self._lock:
+            self.sleep_seconds += seconds
+
+    def _percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of events."""
+        target = math.ceil(fraction * self.events)
+        seen = 0
+        for bound, count in zip(LATENESS_BUCKETS, self.histogram):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max_lateness)
+        return self.max_lateness
+
+    def stats(self):
+        """A JSON-ready snapshot of the counters (times in milliseconds and seconds)."""
+        with self._lock:
+            labels = [f"<={bound * 1000:g}ms" for bound in LATENESS_BUCKETS]
+            labels.append(f">{LATENESS_BUCKETS[-1] * 1000:g}ms")
+            busy = self.sleep_seconds + self.io_seconds
+            return {
+                "events": self.events,
+                "missed_deadlines": self.missed,
+                "missed_threshold_ms": MISSED_DEADLINE * 1000,
+                "mean_lateness_ms": self.total_lateness / self.events * 1000 if self.events else 0.0,
+                "p50_lateness_ms": self._percentile(0.5) * 1000 if self.events else 0.0,
+                "p99_lateness_ms": self._percentile(0.99) * 1000 if self.events else 0.0,
+                "max_lateness_ms": self.max_lateness * 1000,
+                "sleep_seconds": self.sleep_seconds,
+                "io_seconds": self.io_seconds,
+                "io_share": self.io_seconds / busy if busy else 0.0,
+                "histogram": dict(zip(labels, self.histogram)),
+            }
+
+    def dump(self, path):
+        """Writes stats() to path as JSON, replacing the file atomically."""
+        temp = f"{path}.tmp"
+        with open(temp, 'w') as f:
+            json.dump(dict(self.stats(), timestamp=time.time()), f, indent=4)
+        os.replace(temp, path)
+
+    def start_dump(self, path, interval=TELEMETRY_DUMP_INTERVAL):
+        """Dumps stats to path every interval seconds from a background thread."""
+        self.stop_dump()
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass # Keep trying; the path may become writable again
+            self.dump(path)
+
+        thread = threading.Thread(target=loop, name="beep-telemetry", daemon=True)
+        thread.start()
+        self._dumper = (stop, thread, path)
+
+    def stop_dump(self):
+        if self._dumper is not None:
+            stop, thread, _ = self._dumper
+            stop.set()
+            thread.join()
+            self._dumper = None
+
+    @property
+    def dump_path(self):
+        return self._dumper[2] if self._dumper else None
+
+# Process-wide telemetry used by playback unless told otherwise
+TELEMETRY = PlaybackTelemetry()
+
+def playback_stats():
+    """Current playback telemetry for this process."""
+    return TELEMETRY.stats()
+
+def show_telemetry():
+    """Interactive telemetry screen."""
+    print("\n--- 9. PLAYBACK TELEMETRY ---")
+    stats = playback_stats()
+    print(f"  Events fired:      {stats['events']}")
+    print(f"  Missed deadlines:  {stats['missed_deadlines']} (later than {stats['missed_threshold_ms']:g} ms)")
+    print(f"  Lateness (ms):     mean {stats['mean_lateness_ms']:.3f}, p50 <= {stats['p50_lateness_ms']:g}, "
+          f"p99 <= {stats['p99_lateness_ms']:g}, max {stats['max_lateness_ms']:.3f}")
+    print(f"  Time sleeping:     {stats['sleep_seconds']:.2f}s")
+    print(f"  Time in output:    {stats['io_seconds']:.4f}s ({stats['io_share'] * 100:.2f}%)")
+    print("  Lateness histogram:")
+    peak = max(stats['histogram'].values()) or 1
+    for label, count in stats['histogram'].items():
+        print(f"    {label:>10} {count:>8} {'#' * round(40 * count / peak)}")
+    if TELEMETRY.dump_path:
+        print(f"\n  Dumping to {TELEMETRY.dump_path} periodically.")
+
+    action = input("\n(R)eset counters, (D)ump to a JSON file periodically, (S)top dumping, Enter to go back: ").strip().upper()
+    if action == 'R':
+        TELEMETRY.reset()
+        print("\nTelemetry reset.")
+    elif action == 'D':
+        path = input("JSON file (default beep_telemetry.json): ").strip() or "beep_telemetry.json"
+        interval = get_valid_float(f"Interval in seconds (e.g., {TELEMETRY_DUMP_INTERVAL:g}): ", min_val=0.1)
+        TELEMETRY.start_dump(path, interval)
+        print(f"\nDumping telemetry to {path} every {interval:g}s.")
+    elif action == 'S':
+        TELEMETRY.stop_dump()
+        print("\nStopped dumping telemetry.")
+
+
+# --- Morse Code Tables and Timing Profiles ---
+
+MORSE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "morse")
+PROSIGN_MAX_LENGTH = 8        # Longest name accepted between < and >
+PARIS_COUNTS = (10, 4, 9, 4, 1) # Dots, dashes, element gaps, letter gaps, word gaps in "PARIS "
+
+# Element lengths in dot units. With effective_wpm set, characters keep the
+# requested speed but letter and word gaps stretch (Farnsworth spacing) so
+# whole words come out at effective_wpm.
+TimingProfile = namedtuple(
+    "TimingProfile", "name dot dash element_gap char_gap word_gap effective_wpm",
+    defaults=(None,),
+)
+
+STANDARD_PROFILE = TimingProfile(
+    "standard", UNITS_DOT, UNITS_DASH, UNITS_ELEMENT_GAP, UNITS_CHAR_GAP, UNITS_WORD_GAP
+)
+
+class CodeTable:
+    """
+    A Morse code table compiled for lookup by code point: `index` is a dense
+    array from ord(char) to a pattern number in `patterns` (0 = unknown), with
+    both cases of each letter filled in. Looking up a character is one bounds
+    check and one array read, whatever script the table covers.
+    """
+    __slots__ = ("name", "codes", "prosigns", "patterns", "index", "prosign_index", "reverse")
+
+    def __init__(self, name, codes, prosigns=None):
+        self.name = name
+        self.codes = {}
+        self.prosigns = {}
+        self.patterns = ['']
+        self.prosign_index = {}
+        self.reverse = {}
+        numbers = {}
+
+        for char, morse in codes.items():
+            if char == ' ':
+                continue # Word gaps are timing, not a code
+            if not isinstance(char, str) or len(char) != 1:
+                raise ValueError(f"Table '{name}': '{char}' is not a single character.")
+            self._check(name, char, morse)
+            self.codes[char] = morse
+            numbers[char] = len(self.patterns)
+            self.patterns.append(morse)
+            self.reverse.setdefault(morse, char)
+
+        if prosigns and '<' in self.codes:
+            raise ValueError(f"Table '{name}': '<' cannot have a code when prosigns are written <NAME>.")
+        for prosign, morse in (prosigns or {}).items():
+            prosign = prosign.strip('<>').upper()
+            if not prosign.isalnum() or len(prosign) > PROSIGN_MAX_LENGTH:
+                raise ValueError(f"Table '{name}': invalid prosign name '{prosign}'.")
+            self._check(name, prosign, morse)
+            self.prosigns[prosign] = morse
+            self.prosign_index[prosign] = len(self.patterns)
+            self.patterns.append(morse)
+            self.reverse.setdefault(morse, f"<{prosign}>")
+
+        # Let the other case of each letter share its pattern, unless it has its own
+        for char, number in list(numbers.items()):
+            for other in (char.upper(), char.lower()):
+                if len(other) == 1 and other not in numbers:
+                    numbers[other] = number
+
+        self.index = array('I', bytes(4 * (max(map(ord, numbers), default=0) + 1)))
+        for char, number in numbers.items():
+            self.index[ord(char)] = number
+
+    @staticmethod
+    def _check(name, char, morse):
+        if not isinstance(morse, str) or not morse or morse.strip('.-'):
+            raise ValueError(f"Table '{name}': code for '{char}' must be dots and dashes, got {morse!r}.")
+
+    def lookup(self, char):
+        """Pattern number of a single character, 0 if the table has none."""
+        code = ord(char)
+        return self.index[code] if code < len(self.index) else 0
+
+    def to_dict(self):
+        return {"name": self.name, "codes": self.codes, "prosigns": self.prosigns}
+
+ITU_TABLE = CodeTable("itu", MORSE_CODE, MORSE_PROSIGNS)
+CODE_TABLES = {"itu": ITU_TABLE}
+TIMING_PROFILES = {"standard": STANDARD_PROFILE}
+
+def _find_data_file(name):
+    """A path as given if it exists, otherwise name.json in the Morse data directory."""
+    if os.path.exists(name):
+        return name
+    path = os.path.join(MORSE_DATA_DIR, name if name.endswith(".json") else name + ".json")
+    if os.path.exists(path):
+        return path
+    raise ValueError(f"No Morse table or profile named '{name}' (looked in {MORSE_DATA_DIR}).")
+
+def load_code_table(path):
+    """
+    Loads a table from JSON: {"name": ..., "codes": {"A": ".-", ...},
+    "prosigns": {"AR": ".-.-.", ...}}. Prosigns are optional.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data.get("codes"), dict):
+        raise ValueError(f"'{path}' has no \"codes\" mapping.")
+    name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+    return CodeTable(name, data["codes"], data.get("prosigns"))
+
+def load_timing_profile(path):
+    """
+    Loads a profile from JSON. Missing weights default to standard timing, and
+    "effective_wpm" turns on Farnsworth spacing.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    fields = STANDARD_PROFILE._asdict()
+    fields["name"] = os.path.splitext(os.path.basename(path))[0]
+    unknown = set(data) - set(fields)
+    if unknown:
+        raise ValueError(f"'{path}': unknown profile fields {', '.join(sorted(unknown))}.")
+    fields.update(data)
+    return _checked_profile(TimingProfile(**fields))
+
+def _checked_profile(profile):
+    weights = (profile.dot, profile.dash, profile.element_gap, profile.char_gap, profile.word_gap)
+    if any(not isinstance(weight, (int, float)) or weight <= 0 for weight in weights):
+        raise ValueError(f"Profile '{profile.name}': element weights must be positive numbers.")
+    if profile.effective_wpm is not None and profile.effective_wpm <= 0:
+        raise ValueError(f"Profile '{profile.name}': effective_wpm must be positive.")
+    return profile
+
+def get_code_table(name=None):
+    """A built-in table by name, or one loaded (once) from a data file."""
+    if name is None or isinstance(name, CodeTable):
+        return name or ITU_TABLE
+    if name not in CODE_TABLES:
+        CODE_TABLES[name] = load_code_table(_find_data_file(name))
+    return CODE_TABLES[name]
+
+def get_timing_profile(name=None, farnsworth=None):
+    """
+    A built-in or data-file profile by name; farnsworth, if given, overrides
+    its effective speed.
+    """
+    if name is None or isinstance(name, TimingProfile):
+        profile = name or STANDARD_PROFILE
+    else:
+        if name not in TIMING_PROFILES:
+            TIMING_PROFILES[name] = load_timing_profile(_find_data_file(name))
+        profile = TIMING_PROFILES[name]
+    if farnsworth is not None:
+        profile = _checked_profile(profile._replace(effective_wpm=farnsworth))
+    return profile
+
+# A table's patterns in seconds at one speed: `tones[n]` alternates tone and
+# element gap for pattern n (without a trailing gap), `unit` is the dot length.
+MorseTiming = namedtuple("MorseTiming", "unit char_gap word_gap tones")
+
+@lru_cache(maxsize=MORSE_PLAN_CACHE_SIZE)
+def compile_timing(table, profile, wpm):
+    """
+    Works out element and gap lengths for wpm characters per minute. The dot
+    length makes "PARIS " take 60 / wpm seconds under the profile's weights;
+    with Farnsworth spacing only the gaps are lengthened to reach effective_wpm.
+    """
+    if wpm <= 0:
+        raise ValueError("WPM must be positive.")
+    dots, dashes, element_gaps, char_gaps, word_gaps = PARIS_COUNTS
+    character_units = dots * profile.dot + dashes * profile.dash + element_gaps * profile.element_gap
+    spacing_units = char_gaps * profile.char_gap + word_gaps * profile.word_gap
+    unit = 60.0 / (wpm * (character_units + spacing_units))
+    spacing = unit
+    if profile.effective_wpm is not None and profile.effective_wpm < wpm:
+        spacing = (60.0 / profile.effective_wpm - character_units * unit) / spacing_units
+
+    element = {'.': profile.dot * unit, '-': profile.dash * unit}
+    gap = profile.element_gap * unit
+    tones = [()]
+    for morse in table.patterns[1:]:
+        pattern = []
+        for element_char in morse:
+            pattern.append(element[element_char])
+            pattern.append(gap)
+        pattern.pop()
+        tones.append(tuple(pattern))
+    return MorseTiming(unit, profile.char_gap * spacing, profile.word_gap * spacing, tuple(tones))
+
+def skipped_summary(skipped):
+    """One line describing the (char, count) pairs left out of a plan."""
+    total = sum(count for _, count in skipped)
+    listed = ', '.join(f"{char!r} x{count}" for char, count in skipped[:10])
+    more = f", and {len(skipped) - 10} more" if len(skipped) > 10 else ""
+    return f"Skipped {total} unknown character{'s' if total != 1 else ''}: {listed}{more}"
+
+
+# --- Playback Timing Engine ---
+
+# Below this much remaining time we busy-wait instead of calling time.sleep(),
+# which routinely oversleeps by a fraction of a millisecond.
+SPIN_THRESHOLD = 0.001
+
+def sleep_until(deadline, clock=time.perf_counter, sleep=time.sleep):
+    """Blocks until clock() reaches the absolute deadline (in seconds)."""
+    while True:
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        if remaining > SPIN_THRESHOLD:
+            sleep(remaining - SPIN_THRESHOLD)
+        # Otherwise spin for the last sub-millisecond
+
+def run_timeline(events, start=None, clock=time.perf_counter, sleep=time.sleep, telemetry=TELEMETRY):
+    """
+    Plays a timeline of (offset, action) events against absolute deadlines.
+    Offsets are seconds since `start` and must be non-decreasing; action may be None
+    to simply wait until that point. Because every event is scheduled from the same
+    start time, the time spent inside actions (printing, flushing) never accumulates.
+    The clock and sleep function can be swapped out, e.g. for a FakeClock, and
+    each event's lateness and timings go to telemetry unless it is None.
+    Returns the start time used.
+    """
+    if start is None:
+        start = clock()
+    for offset, action in events:
+        deadline = start + offset
+        if telemetry is None:
+            sleep_until(deadline, clock, sleep)
+            if action is not None:
+                action()
+            continue
+
+        before = clock()
+        sleep_until(deadline, clock, sleep)
+        fired = clock()
+        if action is None:
+            telemetry.add_sleep(fired - before)
+            continue
+        action()
+        telemetry.record(fired - deadline, fired - before, clock() - fired)
+    return start
+
+def execute_sequence(sequence, position=0.0, output=None,
+                     clock=time.perf_counter, sleep=time.sleep, quiet=False, telemetry=TELEMETRY):
+    """
+    Executes the custom sequence using the PC speaker bell character, or any
+    other OutputBackend. Playback starts `position` seconds into the sequence.
+    Ctrl+C pauses it and returns the position reached so it can be resumed;
+    otherwise returns None. clock and sleep drive the timing, quiet skips
+    the per-beep log lines, and timings are recorded in telemetry.
+    """
+    if not sequence:
+        print("\nError: No sequence defined to run.")
+        return None
+
+    sequence = as_sequence(sequence)
+    num_beeps = sequence.num_beeps
+    fire_times = sequence.fire_times
+    delays = sequence.delays
+
+    if num_beeps == 0:
+        print("\nSequence has 0 beeps. Doing nothing.")
+        return None
+
+    # Binary search for where to pick up, instead of replaying from the start
+    first = sequence.index_at(position)
+    if position > 0:
+        print(f"\nResuming sequence at {position:.2f}s (beep {first + 1}/{num_beeps}). Press Ctrl+C to pause.")
+    else:
+        print(f"\nExecuting sequence. Initial wait of {sequence.initial_wait} seconds... Press Ctrl+C to pause.")
+
+    output = output or BellOutput()
+    lengths = beep_lengths(sequence)
+    log = EventLog(quiet=quiet)
+
+    def beep_events():
+        for i in range(first, num_beeps):
+            # Bind i now; the action runs after the generator has moved on
+            def fire(i=i):
+                output.tone(lengths[i])
+                log.emit("  -> Beep %d/%d fired.", i + 1, num_beeps)
+                if i < num_beeps - 1:
+                    log.emit("  -> Waiting %s seconds...", delays[i])
+            yield fire_times[i] - position, fire
+
+    start = clock()
+    try:
+        run_timeline(beep_events(), start, clock, sleep, telemetry)
+    except KeyboardInterrupt:
+        paused_at = position + clock() - start
+        log.close()
+        print(f"\n--- Sequence paused at {paused_at:.2f}s of {sequence.total:.2f}s ---")
+        return paused_at
+
+    log.close()
+    print("\n--- Sequence finished ---")
+    return None
+
+def _ask_morse_data(kind, default, load):
+    """Asks for a code table or timing profile by name or JSON file until one loads."""
+    names = []
+    if os.path.isdir(MORSE_DATA_DIR):
+        names = sorted(os.path.splitext(f)[0] for f in os.listdir(MORSE_DATA_DIR) if f.endswith(".json"))
+    listed = f"; data files: {', '.join(names)}" if names else ""
+    while True:
+        value = input(f"{kind} name or JSON file (Enter for {default}{listed}): ").strip()
+        try:
+            return load(value or None)
+        except (OSError, ValueError) as e:
+            print(f"Invalid {kind.lower()}: {e}")
+
+def get_morse_options(wpm):
+    """
+    Asks for the code table, the timing profile and an optional Farnsworth
+    overall speed below the character speed. Returns (profile, table).
+    """
+    table = _ask_morse_data("Code table", "itu", get_code_table)
+    profile = _ask_morse_data("Timing profile", "standard", get_timing_profile)
+    while True:
+        value = input(f"Overall speed for Farnsworth spacing (below {wpm} WPM, Enter for the profile's): ").strip()
+        if not value:
+            return profile, table
+        try:
+            effective = int(value)
+            if 1 <= effective < wpm:
+                return get_timing_profile(profile, effective), table
+            print(f"Value must be a whole number from 1 to {wpm - 1}.")
+        except ValueError:
+            print("Invalid input. Please enter a whole number.")
+
+def text_to_morse_speaker():
+    """Gets user input for text and WPM, then executes the Morse sequence."""
+    print("\n--- 6. TEXT-TO-MORSE SPEAKER (EXPERIMENTAL) ---")
+    
+    text = input("Enter text to translate (A-Z, 0-9, limited punctuation): ").upper()
+    
+    wpm = get_valid_int(
+        "Enter playback speed (Words Per Minute, e.g., 20 WPM): ", min_val=5
+    )
+    profile, table = get_morse_options(wpm)
+    
+    execute_morse_sequence(text, wpm, profile=profile, table=table)
+
+
+# A compiled Morse transmission. `durations` alternates silence and tone
+# (gap, tone, gap, ..., tone, gap), `starts` holds each tone's offset from the
+# start, `owners` the index in the text each tone belongs to, `total` the full
+# length in seconds and `skipped` (char, count) pairs for characters the table
+# lacks, most frequent first. Plans are shared through the cache: treat as read-only.
+MorsePlan = namedtuple("MorsePlan", "durations starts owners total skipped")
+
+def _unwind_prosign(table, start, name, on_unknown):
+    """
+    Yields (index, pattern) for the characters of a '<' + name that turned out
+    not to be a prosign, reporting those the table lacks to on_unknown.
+    """
+    for k, letter in enumerate('<' + name):
+        pattern = table.lookup(letter)
+        if pattern:
+            yield start + k, pattern
+        elif on_unknown is not None:
+            on_unknown(letter)
+
+def _walk_morse(chunks, table=ITU_TABLE, char_gap=UNITS_CHAR_GAP, word_gap=UNITS_WORD_GAP,
+                on_unknown=None):
+    """
+    Walks text chunks and yields (index, gap, pattern) for each character the
+    table knows: the silence owed before it (char_gap after a letter, word_gap
+    per space) and its pattern number. <NAME> sends a prosign. Gap and prosign
+    state carry across chunk boundaries. Ends with (None, final_gap, 0).
+    """
+    index_map = table.index
+    size = len(index_map)
+    prosigns = table.prosign_index
+    gap = 0          # Silence owed before the next tone
+    after_char = False
+    prosign = None   # (start index, name so far) while inside <...>
+    index = 0
+
+    for chunk in chunks:
+        for char in chunk:
+            if prosign is not None:
+                start, name = prosign
+                if char == '>' and name.upper() in prosigns:
+                    prosign = None
+                    yield start, gap, prosigns[name.upper()]
+                    gap = char_gap
+                    after_char = True
+                    index += 1
+                    continue
+                if char.isalnum() and len(name) < PROSIGN_MAX_LENGTH:
+                    prosign = (start, name + char)
+                    index += 1
+                    continue
+                # Not a prosign: send what was collected as ordinary characters
+                prosign = None
+                for position, pattern in _unwind_prosign(table, start, name, on_unknown):
+                    yield position, gap, pattern
+                    gap = char_gap
+                    after_char = True
+
+            # Look the character up first: spaces and '<' never have a pattern
+            code = ord(char)
+            pattern = index_map[code] if code < size else 0
+            if pattern:
+                yield index, gap, pattern
+                gap = char_gap
+                after_char = True
+            elif char == ' ':
+                # A word gap replaces the letter gap rather than adding to it
+                gap = word_gap if after_char else gap + word_gap
+                after_char = False
+            elif char.isspace():
+                # Line breaks and tabs end a word but add no pause of their own
+                if after_char:
+                    gap = word_gap
+                    after_char = False
+            elif char == '<' and prosigns:
+                prosign = (index, '')
+            elif on_unknown is not None:
+                on_unknown(char)
+            index += 1
+
+    if prosign is not None:
+        for position, pattern in _unwind_prosign(table, *prosign, on_unknown):
+            yield position, gap, pattern
+            gap = char_gap
+    yield None, gap, 0
+
+@lru_cache(maxsize=MORSE_PLAN_CACHE_SIZE)
+def compile_morse_plan(text, wpm, profile=STANDARD_PROFILE, table=ITU_TABLE):
+    """Compiles text at the given WPM into a flat, array-backed timing plan."""
+    timing = compile_timing(table, profile, wpm)
+    tones = timing.tones
+    durations = array('d')
+    starts = array('d')
+    owners = array('L')
+    skipped = {}
+
+    def count_unknown(char):
+        skipped[char] = skipped.get(char, 0) + 1
+
+    offset = 0.0
+    for index, gap, pattern in _walk_morse((text,), table, timing.char_gap, timing.word_gap,
+                                           count_unknown):
+        durations.append(gap)
+        offset += gap
+        for k, duration in enumerate(tones[pattern]):
+            durations.append(duration)
+            if k % 2 == 0:
+                starts.append(offset)
+                owners.append(index)
+            offset += duration
+
+    skipped = tuple(sorted(skipped.items(), key=lambda item: -item[1]))
+    return MorsePlan(durations, starts, owners, offset, skipped)
+
+def morse_transcript(text, table=ITU_TABLE):
+    """Renders text as dots and dashes, with '/' between words."""
+    parts = []
+    for index, gap, pattern in _walk_morse((text,), table, char_gap=0, word_gap=1):
+        if pattern:
+            if parts and gap:
+                parts.append('/')
+            parts.append(table.patterns[pattern])
+    return ' '.join(parts)
+
+def execute_morse_sequence(text, wpm, output=None, clock=time.perf_counter, sleep=time.sleep,
+                           quiet=False, telemetry=TELEMETRY, profile=STANDARD_PROFILE, table=ITU_TABLE):
+    """
+    Converts text to Morse Code and executes the beep sequence based on WPM timing.
+    The default profile is Paris standard timing: Dot = T, Dash = 3T, Element Space = T,
+    Char Space = 3T, Word Space = 7T, with T (dot duration) = 1.2 / WPM (seconds).
+    A Farnsworth profile keeps T but stretches the character and word spaces.
+    Tones go to output (the PC speaker bell by default); clock and sleep drive the
+    timing, quiet skips the per-element log lines, and timings are recorded in telemetry.
+    """
+    print(f"\nTranslating '{text}' at {wpm} WPM...")
+
+    plan = compile_morse_plan(text, wpm, profile, table)
+    if plan.skipped:
+        print(f"  [{skipped_summary(plan.skipped)}]")
+
+    timing = compile_timing(table, profile, wpm)
+    print(f"  Morse: {morse_transcript(text, table)}")
+    spacing = ""
+    if profile.effective_wpm is not None and profile.effective_wpm < wpm:
+        spacing = (f" Farnsworth spacing for {profile.effective_wpm} WPM: "
+                   f"letters {timing.char_gap:.3f}s, words {timing.word_gap:.3f}s.")
+    print(f"Base Dot Duration (T): {timing.unit:.3f}s.{spacing} "
+          f"{len(plan.starts)} elements over {plan.total:.2f}s. Starting transmission...")
+
+    output = output or BellOutput()
+    log = EventLog(quiet=quiet)
+    durations = plan.durations
+    owners = plan.owners
+    longest_dot = (profile.dot + profile.dash) / 2 * timing.unit # Anything longer is a dash
+
+    def morse_events():
+        for k, start in enumerate(plan.starts):
+            # Bind k now; the action runs after the generator has moved on
+            def fire(k=k):
+                duration = durations[2 * k + 1]
+                output.tone(duration)
+                log.emit("    - '%s' %s (%.3fs)", text[owners[k]],
+                         "Dot" if duration < longest_dot else "Dash", duration)
+            yield start, fire
+        yield plan.total, None # Hold until the final gap has elapsed
+
+    try:
+        run_timeline(morse_events(), clock=clock, sleep=sleep, telemetry=telemetry)
+    finally:
+        log.close()
+
+    print("\n--- Morse Transmission finished ---")
+
+
+# --- PCM / WAV Rendering ---
+
+DEFAULT_TONE_HZ = 800.0
+DEFAULT_SAMPLE_RATE = 44100
+DEFAULT_RAMP = 0.005        # Attack/release in seconds, long enough to avoid clicks
+DEFAULT_AMPLITUDE = 0.8     # Fraction of 16-bit full scale
+BEEP_DURATION = 0.1         # Length of one rendered beep from a custom sequence
+WAV_FILENAME = "beeps.wav"
+
+def _numpy():
+    """Imports NumPy on first use so the menu starts without it."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy is required for audio rendering (pip install numpy).")
+    return numpy
+
+def sequence_durations(sequence, beep_length=BEEP_DURATION):
+    """
+    Converts a beep sequence into the same gap/tone/gap layout as a Morse plan.
+    A beep is cut short if the next one is due before it would finish.
+    """
+    sequence = as_sequence(sequence)
+    durations = array('d', [sequence.initial_wait])
+    for delay, tone in zip(sequence.delays, beep_lengths(sequence, beep_length)):
+        durations.append(tone)
+        durations.append(delay - tone)
+    if sequence.num_beeps:
+        durations.append(beep_length)
+        durations.append(0.0)
+    return durations
+
+def beep_lengths(sequence, beep_length=BEEP_DURATION):
+    """Length of each beep in a sequence, cut short where the next beep comes sooner."""
+    sequence = as_sequence(sequence)
+    lengths = array('d', (min(beep_length, delay) for delay in sequence.delays))
+    if sequence.num_beeps:
+        lengths.append(beep_length)
+    return lengths
+
+def _tone_segment(np, num_samples, frequency, sample_rate, ramp, amplitude):
+    """Synthesizes one enveloped sine tone of num_samples as int16."""
+    t = np.arange(num_samples) / sample_rate
+    wave = np.sin(2 * np.pi * frequency * t)
+
+    # Linear attack and release so the tone doesn't start or stop with a click
+    ramp_samples = min(int(ramp * sample_rate), num_samples // 2)
+    if ramp_samples > 0:
+        envelope = np.linspace(0.0, 1.0, ramp_samples, endpoint=False)
+        wave[:ramp_samples] *= envelope
+        wave[num_samples - ramp_samples:] *= envelope[::-1]
+
+    return (wave * (amplitude * 32767)).astype(np.int16)
+
+def render_tones(durations, frequency=DEFAULT_TONE_HZ, sample_rate=DEFAULT_SAMPLE_RATE,
+                 ramp=DEFAULT_RAMP, amplitude=DEFAULT_AMPLITUDE):
+    """
+    Renders alternating gap/tone durations (seconds) to mono int16 PCM.
+    Each tone is synthesized as a whole NumPy segment, and identical lengths
+    (every dot, every dash) are only synthesized once.
+    """
+    np = _numpy()
+
+    # Sample boundaries come from the running total, so rounding never drifts
+    edges = np.rint(np.concatenate(([0.0], np.cumsum(durations))) * sample_rate).astype(np.int64)
+    pcm = np.zeros(int(edges[-1]), dtype=np.int16)
+
+    segments = {}
+    for k in range(1, len(durations), 2):
+        begin, end = edges[k], edges[k + 1]
+        num_samples = int(end - begin)
+        if num_samples <= 0:
+            continue
+        segment = segments.get(num_samples)
+        if segment is None:
+            segment = _tone_segment(np, num_samples, frequency, sample_rate, ramp, amplitude)
+            segments[num_samples] = segment
+        pcm[begin:end] = segment
+    return pcm
+
+def write_wav(path, pcm, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Writes mono int16 PCM to a WAV file."""
+    import wave
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.astype('<i2').tobytes())
+
+def render_sequence_wav(sequence, path, beep_length=BEEP_DURATION, **tone):
+    """Renders a beep sequence to a WAV file. Returns the length in seconds."""
+    sample_rate = tone.get("sample_rate", DEFAULT_SAMPLE_RATE)
+    pcm = render_tones(sequence_durations(sequence, beep_length), **tone)
+    write_wav(path, pcm, sample_rate)
+    return len(pcm) / sample_rate
+
+def render_morse_wav(text, wpm, path, profile=STANDARD_PROFILE, table=ITU_TABLE, **tone):
+    """Renders text as Morse to a WAV file. Returns the length in seconds."""
+    sample_rate = tone.get("sample_rate", DEFAULT_SAMPLE_RATE)
+    pcm = render_tones(compile_morse_plan(text, wpm, profile, table).durations, **tone)
+    write_wav(path, pcm, sample_rate)
+    return len(pcm) / sample_rate
+
+# --- Streaming Rendering ---
+
+TEXT_CHUNK_SIZE = 64 * 1024   # Characters read from the input per step
+PCM_BLOCK_SAMPLES = 16384     # Samples per emitted PCM block
+SEGMENT_CACHE_LIMIT = 64      # Distinct tone lengths kept synthesized at once
+
+def read_text_chunks(f, chunk_size=TEXT_CHUNK_SIZE):
+    """Yields fixed-size chunks of text from an open file until it is exhausted."""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def morse_duration_stream(chunks, wpm, profile=STANDARD_PROFILE, table=ITU_TABLE, on_unknown=None):
+    """
+    Lazily turns text chunks into the alternating gap/tone durations (seconds)
+    of a Morse plan, without ever holding the whole text.
+    """
+    timing = compile_timing(table, profile, wpm)
+    tones = timing.tones
+    for _, gap, pattern in _walk_morse(chunks, table, timing.char_gap, timing.word_gap, on_unknown):
+        yield gap
+        yield from tones[pattern]
+
+def pcm_block_stream(durations, block_samples=PCM_BLOCK_SAMPLES, frequency=DEFAULT_TONE_HZ,
+                     sample_rate=DEFAULT_SAMPLE_RATE, ramp=DEFAULT_RAMP,
+                     amplitude=DEFAULT_AMPLITUDE):
+    """
+    Lazily renders alternating gap/tone durations into int16 PCM blocks of
+    block_samples (the last one may be shorter). Only one block and a small
+    cache of tone segments are alive at a time.
+    """
+    np = _numpy()
+    block = np.zeros(block_samples, dtype=np.int16)
+    fill = 0
+    elapsed = 0.0
+    edge = 0
+    segments = {}
+    is_tone = False
+
+    for duration in durations:
+        # Sample boundaries come from the running total, so rounding never drifts
+        elapsed += duration
+        end = int(round(elapsed * sample_rate))
+        num_samples = end - edge
+        edge = end
+
+        if num_samples > 0:
+            segment = None
+            if is_tone:
+                segment = segments.get(num_samples)
+                if segment is None:
+                    segment = _tone_segment(np, num_samples, frequency, sample_rate, ramp, amplitude)
+                    if len(segments) < SEGMENT_CACHE_LIMIT:
+                        segments[num_samples] = segment
+
+            pos = 0
+            while pos < num_samples:
+                take = min(num_samples - pos, block_samples - fill)
+                if segment is not None:
+                    block[fill:fill + take] = segment[pos:pos + take]
+                # Silence is free: every block starts out zeroed
+                fill += take
+                pos += take
+                if fill == block_samples:
+                    yield block
+                    block = np.zeros(block_samples, dtype=np.int16)
+                    fill = 0
+
+        is_tone = not is_tone
+
+    if fill:
+        yield block[:fill]
+
+def write_pcm_stream(blocks, path, sample_rate=DEFAULT_SAMPLE_RATE):
+    """
+    Writes PCM blocks as they arrive. path '-' streams raw signed 16-bit
+    little-endian PCM to stdout; anything else becomes a WAV file.
+    Returns the number of samples written.
+    """
+    written = 0
+    if path == '-':
+        out = sys.stdout.buffer
+        for block in blocks:
+            out.write(block.astype('<i2').tobytes())
+            written += len(block)
+        out.flush()
+        return written
+
+    import wave
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        for block in blocks:
+            f.writeframesraw(block.astype('<i2').tobytes())
+            written += len(block)
+    return written
+
+def stream_morse_file(source, wpm, path, profile=STANDARD_PROFILE, table=ITU_TABLE, on_unknown=None, **tone):
+    """
+    Streams a text file (or '-' for stdin) through Morse timing and PCM
+    rendering into path, in constant memory. Returns the length in seconds.
+    """
+    sample_rate = tone.get("sample_rate", DEFAULT_SAMPLE_RATE)
+    f = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8', errors='replace')
+    try:
+        durations = morse_duration_stream(read_text_chunks(f), wpm, profile, table, on_unknown)
+        written = write_pcm_stream(pcm_block_stream(durations, **tone), path, sample_rate)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return written / sample_rate
+
+def render_to_wav(current_sequence):
+    """Interactively renders the current sequence or a Morse message to a WAV file."""
+    print("\n--- 7. RENDER TO WAV FILE ---")
+
+    kind = input("Render (S)equence, (M)orse text, or Morse from a text (F)ile? ").strip().upper()
+    if kind not in ('S', 'M', 'F'):
+        print("\nError: Please enter S, M or F.")
+        return
+    if kind == 'S' and not current_sequence:
+        print("\nError: No sequence defined to render.")
+        return
+
+    if kind == 'F':
+        source = input("Text file to translate: ").strip()
+    if kind == 'M':
+        text = input("Enter text to translate (A-Z, 0-9, limited punctuation): ").upper()
+    if kind in ('M', 'F'):
+        wpm = get_valid_int("Enter speed (Words Per Minute, e.g., 20 WPM): ", min_val=5)
+        profile, table = get_morse_options(wpm)
+
+    path = input(f"Output file (default {WAV_FILENAME}): ").strip() or WAV_FILENAME
+    frequency = get_valid_float(f"Tone frequency in Hz (e.g., {DEFAULT_TONE_HZ:g}): ", min_val=20.0)
+
+    try:
+        start = time.perf_counter()
+        if kind == 'S':
+            seconds = render_sequence_wav(current_sequence, path, frequency=frequency)
+        elif kind == 'M':
+            seconds = render_morse_wav(text, wpm, path, profile, table, frequency=frequency)
+        else:
+            seconds = stream_morse_file(source, wpm, path, profile, table, frequency=frequency)
+        elapsed = time.perf_counter() - start
+        print(f"\nRendered {seconds:.2f}s of audio to {path} in {elapsed * 1000:.1f} ms.")
+    except Exception as e:
+        print(f"\nError rendering file: {e}")
+
+
+# --- Morse Decoding ---
+
+UNKNOWN_SYMBOL = '*'             # Written for any pattern not in the table
+
+DECODE_CHUNK_SAMPLES = 4096
+DECODE_FRAME_SECONDS = 0.001     # Envelope resolution
+DECODE_MIN_LEVEL = 0.02          # Envelope below this fraction of full scale is always silence
+DECODE_WINDOW_FRAMES = 50        # Frames per level-tracking step, whatever the chunk size
+DECODE_PEAK_HALF_LIFE = 0.25     # Seconds for the tracked signal peak to halve
+DECODE_FLOOR_RISE = 0.05         # Fastest rise of the tracked noise floor, in full scale per second
+DECODE_NOISE_MARGIN = 3.0        # The threshold stays this far above the noise floor
+DECODE_ADAPT_RATE = 0.25         # How quickly the unit estimate follows the sender
+DECODE_DEBOUNCE_FRAMES = 3       # Runs shorter than this are noise, not a mark or space
+DECODE_SEED_MARKS = 4            # Marks measured before the first one is classified
+DECODE_SEED_GAPS = 2             # ...along with this many letter or word gaps
+DECODE_SEED_RUNS = 40            # Most runs held back, even if the gaps haven't come
+DECODE_GAP_HISTORY = 8           # Recent letter/word gaps the letter gap is judged from
+DECODE_WORD_GAP_UNITS = (5, 9)   # Gaps all this long (in units) are standard word gaps
+
+class MorseDecoder:
+    """
+    Decodes Morse from PCM fed in chunks of any size. Each chunk is reduced to
+    a 1 ms envelope and thresholded with NumPy, then only the mark/space
+    transitions are handled in Python. The threshold follows the signal level
+    in fixed windows of time, so the result doesn't depend on the chunk size.
+    Marks and spaces are classified against a dot-length estimate that
+    follows the sender's speed as it changes, and word gaps against the
+    letter gaps actually seen, so Farnsworth spacing (letter gaps far longer
+    than three dots) is not mistaken for word breaks. The first few runs are
+    held back and measured before any are classified, so a starting guess far
+    from the sender's speed cannot garble the opening.
+    """
+
+    def __init__(self, sample_rate=DEFAULT_SAMPLE_RATE, wpm=20, table=ITU_TABLE):
+        self.np = _numpy()
+        self.reverse = table.reverse # Dots and dashes back to characters (or <PROSIGN>)
+        self.sample_rate = sample_rate
+        self.frame = max(1, int(round(sample_rate * DECODE_FRAME_SECONDS)))
+        self.frame_seconds = self.frame / sample_rate
+        self.unit = (1.2 / wpm) / self.frame_seconds # Dot length, in frames
+        self.window = self.frame * DECODE_WINDOW_FRAMES # Samples per level-tracking step
+        self.peak = 0.0
+        self.floor = 0.0
+        self.leftover = self.np.zeros(0, dtype=self.np.float32)
+
+        self.marking = False   # State of the current run
+        self.run = 0           # Its length so far, in frames
+        self.symbol = ''       # Dots and dashes of the character in progress
+        self.spaced = True     # Whether a word space was already written
+        self.seed = []         # (marking, run) held back until the dot length is seeded
+        self.gaps = deque(maxlen=DECODE_GAP_HISTORY) # Recent spaces of two units or more
+        self.letter = None     # Letter gap last seen alongside word gaps
+        self.output = []
+
+    @property
+    def wpm(self):
+        """Current estimate of the sender's speed."""
+        return 1.2 / (self.unit * self.frame_seconds)
+
+    def feed(self, pcm):
+        """Consumes a chunk of mono PCM (int16 or float) and returns any newly decoded text."""
+        np = self.np
+        samples = np.asarray(pcm)
+        if samples.dtype.kind in 'iu':
+            samples = samples.astype(np.float32) / 32768.0
+        samples = np.concatenate((self.leftover, np.abs(samples, dtype=np.float32)))
+
+        # Whole windows only; the remainder waits for the next chunk
+        usable = len(samples) - len(samples) % self.window
+        self.leftover = samples[usable:]
+        if not usable:
+            return ''
+        windows = samples[:usable].reshape(-1, DECODE_WINDOW_FRAMES, self.frame).mean(axis=2)
+        self._walk((windows > self._thresholds(windows)[:, None]).ravel())
+
+        # Let characters out during a long silence instead of waiting for the next mark
+        if not self.marking:
+            self._check_space()
+        return self._take()
+
+    def _walk(self, on):
+        """Extends or ends runs from a sequence of frame states."""
+        # Walk runs of equal state, found with one vectorized comparison
+        edges = self.np.flatnonzero(on[1:] != on[:-1]) + 1
+        begin = 0
+        for end in (*edges.tolist(), len(on)):
+            state = bool(on[begin])
+            if state == self.marking or end - begin < DECODE_DEBOUNCE_FRAMES:
+                self.run += end - begin
+            else:
+                self._end_run()
+                self.marking = state
+                self.run = end - begin
+            begin = end
+
+    def _thresholds(self, windows):
+        """
+        One mark/space threshold per window of envelope frames: half the signal
+        peak, which decays with DECODE_PEAK_HALF_LIFE so a fading or quieter
+        sender is still heard, but never within DECODE_NOISE_MARGIN of the
+        noise floor. Both recurrences are solved for all windows at once.
+        """
+        np = self.np
+        seconds = DECODE_WINDOW_FRAMES * self.frame_seconds
+        steps = np.arange(1, len(windows) + 1)
+
+        # peak[i] = max(peak[i-1] * decay, loudest[i]), in the log domain
+        log_decay = -math.log(2) * seconds / DECODE_PEAK_HALF_LIFE
+        loudest = np.log(np.maximum(windows.max(axis=1), 1e-9)) - steps * log_decay
+        loudest = np.maximum(loudest, math.log(max(self.peak, 1e-9)))
+        peaks = np.exp(np.maximum.accumulate(loudest) + steps * log_decay)
+
+        # floor[i] = min(floor[i-1] + rise, quietest[i]); marks can only nudge it up
+        rise = DECODE_FLOOR_RISE * seconds
+        quietest = np.minimum(windows.min(axis=1) - steps * rise, self.floor)
+        floors = np.minimum.accumulate(quietest) + steps * rise
+
+        self.peak = float(peaks[-1])
+        self.floor = float(floors[-1])
+        return np.maximum(np.maximum(peaks * 0.5, floors * DECODE_NOISE_MARGIN), DECODE_MIN_LEVEL)
+
+    def finish(self):
+        """Flushes whatever character is still pending at the end of the input."""
+        # The last partial window is judged on its own frames; padding it with
+        # silence would drag the noise floor down and let noise through
+        frames = len(self.leftover) // self.frame
+        if frames:
+            window = self.leftover[:frames * self.frame].reshape(1, frames, self.frame).mean(axis=2)
+            self._walk((window > self._thresholds(window)[:, None]).ravel())
+        self.leftover = self.leftover[:0]
+        self._end_run()
+        if self.seed is not None:
+            self._apply_seed()
+        self.marking = False
+        self.run = 0
+        if self.symbol:
+            self._end_char()
+        return self._take().rstrip()
+
+    def _take(self):
+        text = ''.join(self.output)
+        self.output.clear()
+        return text
+
+    def _end_run(self):
+        if self.run <= 0:
+            return
+        if self.seed is not None:
+            if self.marking or self.seed: # Leading silence says nothing about speed
+                self.seed.append((self.marking, self.run))
+            if self._seeded():
+                self._apply_seed()
+            return
+        if self.marking:
+            # Dots and dashes both tell us the dot length (a dash is three units)
+            if self.run < 2 * self.unit:
+                self.symbol += '.'
+                sample = self.run
+            else:
+                self.symbol += '-'
+                sample = self.run / 3
+            if self.unit / 2 < sample < self.unit * 2:
+                self.unit += DECODE_ADAPT_RATE * (sample - self.unit)
+            else:
+                self.unit = sample # Way off (e.g. the starting guess): jump straight there
+        else:
+            if self.symbol and self.unit / 2 < self.run < 2 * self.unit:
+                # Gaps inside a character are one unit long too
+                self.unit += DECODE_ADAPT_RATE * (self.run - self.unit)
+            self._check_space()
+            if self.run >= 2 * self.unit:
+                self._note_gaps((self.run,))
+
+    def _seed_unit(self, seed):
+        """
+        The dot length the held-back runs show. Dots and element gaps are the
+        shortest runs, so their mean is the unit, unless nothing is twice as
+        long (all dashes, say) and the runs can't tell dots from dashes; then
+        the current estimate stands.
+        """
+        runs = [run for _, run in seed]
+        shortest = min(runs)
+        if max(runs) < 2 * shortest:
+            return self.unit
+        close = [run for run in runs if run < 1.5 * shortest]
+        return sum(close) / len(close)
+
+    def _seeded(self):
+        """Whether enough runs are held back to set the dot length and letter gap."""
+        if sum(marking for marking, _ in self.seed) < DECODE_SEED_MARKS:
+            return False
+        if len(self.seed) >= DECODE_SEED_RUNS:
+            return True
+        unit = self._seed_unit(self.seed)
+        gaps = [run for marking, run in self.seed if not marking and run >= 2 * unit]
+        return len(gaps) >= DECODE_SEED_GAPS and not self._maybe_word_gaps(gaps, unit)
+
+    def _apply_seed(self):
+        """
+        Sets the dot length and the letter gap history from the held-back
+        runs, then classifies them.
+        """
+        seed, self.seed = self.seed, None
+        if not seed:
+            return
+        self.unit = self._seed_unit(seed)
+        # Judge the first gaps against the ones after them, then replay normally
+        gaps = [run for marking, run in seed if not marking and run >= 2 * self.unit]
+        self._note_gaps(gaps)
+        for self.marking, self.run in seed:
+            self._end_run()
+        self.gaps = deque(gaps, maxlen=DECODE_GAP_HISTORY)
+
+    def _note_gaps(self, gaps):
+        """Adds spaces of 2 units or more to the history the letter gap is judged from."""
+        self.gaps.extend(gaps)
+        if self.gaps and max(self.gaps) >= min(self.gaps) * 5 / 3:
+            self.letter = min(self.gaps) # Letter and word gaps both in view
+
+    @staticmethod
+    def _maybe_word_gaps(gaps, unit):
+        """
+        Whether gaps are all of one kind and about seven units long, so they
+        could be standard word gaps as well as mild Farnsworth letter gaps.
+        """
+        shortest = min(gaps)
+        low, high = DECODE_WORD_GAP_UNITS
+        return max(gaps) < shortest * 5 / 3 and low * unit <= shortest <= high * unit
+
+    def _letter_gap(self):
+        """
+        The letter gap, in frames, never under the standard 3 units. With
+        letter and word gaps both in view it is the shortest recent gap.
+        With one kind in view, the letter gap seen last tells which kind it
+        is; before there is one, gaps of about seven units are taken for
+        standard word gaps and longer ones for Farnsworth letter gaps.
+        """
+        standard = 3 * self.unit
+        if not self.gaps:
+            return max(self.letter or 0.0, standard)
+        shortest = min(self.gaps)
+        if self.letter is not None and shortest >= self.letter * 5 / 3:
+            return max(self.letter, standard) # Only word gaps in view
+        if self.letter is None and self._maybe_word_gaps(self.gaps, self.unit):
+            return standard
+        return max(shortest, standard)
+
+    def _check_space(self):
+        """
+        Acts on the current space: a letter gap from 2 units, and a word gap
+        from 5/3 of the letter gap (5 units at standard spacing).
+        """
+        if self.run >= 2 * self.unit and self.symbol:
+            self._end_char()
+        if self.run >= self._letter_gap() * 5 / 3 and not self.spaced:
+            self.output.append(' ')
+            self.spaced = True
+
+    def _end_char(self):
+        self.output.append(self.reverse.get(self.symbol, UNKNOWN_SYMBOL))
+        self.symbol = ''
+        self.spaced = False
+
+def read_wav_chunks(path, chunk_samples=DECODE_CHUNK_SAMPLES):
+    """Yields (sample_rate, int16 samples of the first channel) chunks from a 16-bit WAV file."""
+    import wave
+    np = _numpy()
+    with wave.open(path, 'rb') as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"'{path}' is not 16-bit PCM.")
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        while True:
+            data = f.readframes(chunk_samples)
+            if not data:
+                return
+            samples = np.frombuffer(data, dtype='<i2')
+            if channels > 1:
+                samples = samples[::channels]
+            yield rate, samples
+
+def decode_wav(path, wpm=20, chunk_samples=DECODE_CHUNK_SAMPLES, on_text=None, table=ITU_TABLE):
+    """Decodes a Morse WAV file chunk by chunk. on_text receives text as it is decoded."""
+    decoder = None
+    parts = []
+    for rate, samples in read_wav_chunks(path, chunk_samples):
+        if decoder is None:
+            decoder = MorseDecoder(rate, wpm, table)
+        text = decoder.feed(samples)
+        if text:
+            parts.append(text)
+            if on_text is not None:
+                on_text(text)
+    if decoder is not None:
+        text = decoder.finish()
+        parts.append(text)
+        if on_text is not None and text:
+            on_text(text)
+    return ''.join(parts).strip()
+
+def benchmark_decoder(text="THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789 " * 20,
+                      wpm=(15, 40), chunk_samples=DECODE_CHUNK_SAMPLES, noise=0.1, seed=1, guess=None,
+                      fade=1.0):
+    """
+    Renders text as Morse with the sender drifting from wpm[0] to wpm[1] word
+    by word and its level fading to fade times the start over one second
+    halfway through, adds noise, and times decoding it chunk by chunk,
+    starting from a speed estimate of guess (default wpm[0]). Returns
+    (audio seconds, CPU seconds, realtime factor, decoded text matches).
+    """
+    np = _numpy()
+    words = text.split()
+    durations = array('d', [0.0])
+    for i, word in enumerate(words):
+        speed = wpm[0] + (wpm[1] - wpm[0]) * i / max(len(words) - 1, 1)
+        plan = compile_morse_plan(word + ' ', speed)
+        durations[-1] += plan.durations[0] # Join the word gap to the next leading gap
+        durations.extend(plan.durations[1:])
+    pcm = render_tones(durations).astype(np.float32) / 32768.0
+    if fade != 1.0:
+        fading = np.arange(len(pcm)) / DEFAULT_SAMPLE_RATE - len(pcm) / DEFAULT_SAMPLE_RATE / 2
+        pcm *= (fade ** np.clip(fading, 0.0, 1.0)).astype(np.float32)
+    pcm += np.random.default_rng(seed).normal(0.0, noise, len(pcm)).astype(np.float32)
+
+    decoder = MorseDecoder(DEFAULT_SAMPLE_RATE, guess or wpm[0])
+    parts = []
+    start = time.process_time()
+    for begin in range(0, len(pcm), chunk_samples):
+        parts.append(decoder.feed(pcm[begin:begin + chunk_samples]))
+    parts.append(decoder.finish())
+    cpu = time.process_time() - start
+
+    audio = len(pcm) / DEFAULT_SAMPLE_RATE
+    decoded = ' '.join(''.join(parts).split())
+    return audio, cpu, audio / cpu if cpu > 0 else float('inf'), decoded == ' '.join(text.split())
+
+
+# --- Batch Rendering ---
+
+BATCH_CHUNK_JOBS = 4          # Jobs handed to a worker at a time
+BATCH_CHUNKS_PER_WORKER = 2   # Chunks in flight per worker; bounds memory for huge manifests
+
+# Outcome of one manifest entry; error is None when it rendered
+BatchResult = namedtuple("BatchResult", "index output seconds elapsed error")
+
+def read_manifest(path):
+    """
+    Lazily yields (index, job) from a JSON-lines manifest. Each line holds
+    "output", "wpm" and either "text" or "file" (a text file to translate),
+    plus optional tone settings ("frequency", "sample_rate", "ramp", "amplitude")
+    and Morse settings ("table", "profile", "farnsworth").
+    Blank lines and lines starting with '#' are skipped.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        index = 0
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                job = json.loads(line)
+                if "output" not in job or "wpm" not in job or not ("text" in job or "file" in job):
+                    raise ValueError('needs "output", "wpm" and "text" or "file"')
+                if job["wpm"] < 5:
+                    raise ValueError("WPM must be 5 or greater")
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}, line {number}: {e}")
+            yield index, job
+            index += 1
+
+def _render_batch_job(job):
+    """Renders one manifest job through the streaming renderer. Returns audio seconds."""
+    tone = {key: job[key] for key in ("frequency", "sample_rate", "ramp", "amplitude") if key in job}
+    profile = get_timing_profile(job.get("profile"), job.get("farnsworth"))
+    table = get_code_table(job.get("table"))
+    if "file" in job:
+        return stream_morse_file(job["file"], job["wpm"], job["output"], profile, table, **tone)
+    sample_rate = tone.get("sample_rate", DEFAULT_SAMPLE_RATE)
+    blocks = pcm_block_stream(morse_duration_stream((job["text"],), job["wpm"], profile, table), **tone)
+    return write_pcm_stream(blocks, job["output"], sample_rate) / sample_rate
+
+def _render_batch_chunk(chunk):
+    """Worker entry point: renders a chunk of (index, job) pairs, one result each."""
+    results = []
+    for index, job in chunk:
+        start = time.perf_counter()
+        try:
+            seconds, error = _render_batch_job(job), None
+        except Exception as e:
+            seconds, error = 0.0, f"{type(e).__name__}: {e}"
+        results.append(BatchResult(index, job["output"], seconds, time.perf_counter() - start, error))
+    return results
+
+def render_batch(jobs, workers=None, chunk_jobs=BATCH_CHUNK_JOBS):
+    """
+    Renders (index, job) pairs across a process pool and yields each result as
+    it finishes (use result.index for manifest order). Jobs are pulled lazily
+    and sent out in chunks, with at most BATCH_CHUNKS_PER_WORKER chunks per
+    worker in flight, and nothing is kept once yielded. Every job's output
+    depends only on the job itself, so the files are identical however many
+    workers run.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    pending = set()
+
+    def next_chunk():
+        chunk = []
+        for item in jobs:
+            chunk.append(item)
+            if len(chunk) == chunk_jobs:
+                break
+        return chunk
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(pending) < workers * BATCH_CHUNKS_PER_WORKER:
+                chunk = next_chunk()
+                if not chunk:
+                    break
+                pending.add(pool.submit(_render_batch_chunk, chunk))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+def run_batch(manifest_path, workers=None):
+    """Renders a manifest with progress and a timing summary. Returns the number of failures."""
+    start = time.perf_counter()
+    finished = failures = 0
+    audio = busy = 0.0
+
+    for result in render_batch(read_manifest(manifest_path), workers):
+        finished += 1
+        busy += result.elapsed
+        if result.error:
+            failures += 1
+            print(f"[{finished}] FAILED {result.output}: {result.error}")
+        else:
+            audio += result.seconds
+            print(f"[{finished}] {result.output}: {result.seconds:.1f}s of audio "
+                  f"in {result.elapsed * 1000:.0f} ms")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{finished - failures}/{finished} jobs rendered, {audio:.1f}s of audio "
+          f"in {elapsed:.2f}s ({busy / elapsed if elapsed > 0 else 0:.1f} workers busy on average).")
+    return failures
+
+
+# --- Output Backends and Event Log ---
+
+class OutputBackend:
+    """
+    Something that sounds a tone. tone() runs on the timing-critical path, so
+    implementations must return quickly and leave logging to an EventLog.
+    """
+
+    def tone(self, duration):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class BellOutput(OutputBackend):
+    """The PC speaker bell character. The beep length is up to the terminal."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def tone(self, duration):
+        self.stream.write('\a')
+        self.stream.flush()
+
+class NullOutput(OutputBackend):
+    """Makes no sound at all."""
+
+    def tone(self, duration):
+        pass
+
+class WavOutput(OutputBackend):
+    """
+    Records when each tone was sounded and writes what was actually played
+    to a WAV file on close. A tone is cut short if the next one starts first.
+    """
+
+    def __init__(self, path=WAV_FILENAME, clock=time.perf_counter, **tone):
+        self.path = path
+        self.clock = clock
+        self.tone_settings = tone
+        self.times = array('d')
+        self.lengths = array('d')
+
+    def tone(self, duration):
+        self.times.append(self.clock())
+        self.lengths.append(duration)
+
+    def close(self):
+        if not self.times:
+            return
+        durations = array('d', [0.0])
+        for i, (at, length) in enumerate(zip(self.times, self.lengths)):
+            if i + 1 < len(self.times):
+                length = min(length, self.times[i + 1] - at)
+                durations.extend((length, self.times[i + 1] - at - length))
+            else:
+                durations.extend((length, 0.0))
+        write_wav(self.path, render_tones(durations, **self.tone_settings),
+                  self.tone_settings.get("sample_rate", DEFAULT_SAMPLE_RATE))
+
+class AudioOutput(OutputBackend):
+    """Plays tones on the default sound device through the optional sounddevice package."""
+
+    def __init__(self, frequency=DEFAULT_TONE_HZ, sample_rate=DEFAULT_SAMPLE_RATE,
+                 ramp=DEFAULT_RAMP, amplitude=DEFAULT_AMPLITUDE):
+        try:
+            import sounddevice
+        except ImportError:
+            raise RuntimeError("The sounddevice package is required for audio output (pip install sounddevice).")
+        self.device = sounddevice
+        self.np = _numpy()
+        self.settings = (frequency, sample_rate, ramp, amplitude)
+        self.segments = {}
+
+    def tone(self, duration):
+        sample_rate = self.settings[1]
+        num_samples = int(round(duration * sample_rate))
+        segment = self.segments.get(num_samples)
+        if segment is None:
+            segment = _tone_segment(self.np, num_samples, *self.settings)
+            self.segments[num_samples] = segment
+        self.device.play(segment, sample_rate) # Returns immediately
+
+    def close(self):
+        self.device.wait()
+
+OUTPUT_BACKENDS = {
+    "bell": BellOutput,
+    "audio": AudioOutput,
+    "wav": WavOutput,
+    "null": NullOutput,
+}
+
+# How many log lines can wait for the writer thread before the oldest are dropped
+EVENT_LOG_CAPACITY = 4096
+EVENT_LOG_INTERVAL = 0.05
+
+class EventLog:
+    """
+    Per-event text output kept off the timing path. emit() only appends the
+    unformatted template and arguments to a bounded ring buffer; a background
+    thread formats and writes them in batches. A quiet log discards everything.
+    """
+
+    def __init__(self, stream=None, quiet=False, capacity=EVENT_LOG_CAPACITY):
+        self.stream = stream or sys.stdout
+        self.quiet = quiet
+        self.buffer = deque(maxlen=capacity)
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if not quiet:
+            self._thread = threading.Thread(target=self._drain_loop, name="beep-log", daemon=True)
+            self._thread.start()
+
+    def emit(self, template, *args):
+        if self.quiet:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append((template, args))
+
+    def flush(self):
+        """Writes out everything buffered so far."""
+        with self._lock:
+            lines = []
+            while True:
+                try:
+                    template, args = self.buffer.popleft()
+                except IndexError:
+                    break
+                lines.append(template % args if args else template)
+            if lines:
+                self.stream.write('\n'.join(lines) + '\n')
+                self.stream.flush()
+
+    def _drain_loop(self):
+        while not self._stop.wait(EVENT_LOG_INTERVAL):
+            self.flush()
+
+    def close(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        self.flush()
+        if self.dropped:
+            self.stream.write(f"  [{self.dropped} log lines dropped]\n")
+            self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# --- Timing Benchmarks ---
+
+# Regression bounds for fake-clock runs, in seconds. Those runs are exact apart
+# from clock ticks, so any real scheduling slip shows up well above these.
+BENCH_LATENESS_LIMIT = 0.001 # Mean and p99 lateness
+BENCH_DRIFT_LIMIT = 0.001    # Change in lateness from the first event to the last
+
+class FakeClock:
+    """
+    A deterministic stand-in for time.perf_counter/time.sleep. sleep() advances
+    time exactly, and every reading costs `tick` seconds so spin-waits end.
+    """
+
+    def __init__(self, start=0.0, tick=1e-5):
+        self.now = start
+        self.tick = tick
+
+    def __call__(self):
+        self.now += self.tick
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+class RecordingSink(OutputBackend):
+    """
+    An output that records the clock reading at every tone. With a FakeClock,
+    `cost` seconds are added per tone to model a slow device or pipe.
+    """
+
+    def __init__(self, clock, cost=0.0):
+        self.clock = clock
+        self.cost = cost
+        self.times = array('d')
+
+    def tone(self, duration):
+        self.times.append(self.clock())
+        if self.cost:
+            self.clock.advance(self.cost)
+
+# Timing accuracy of one run. Lateness is actual minus ideal emit time (seconds),
+# drift is how much lateness grew from the first to the last event, and
+# throughput is events handled per second of real time.
+TimingReport = namedtuple(
+    "TimingReport", "name events mean_lateness p99_lateness max_lateness drift throughput"
+)
+
+def timing_report(name, ideal, actual, elapsed):
+    """Compares actual emit offsets against the ideal schedule."""
+    if len(actual) != len(ideal):
+        raise ValueError(f"{name}: {len(actual)} events emitted, {len(ideal)} scheduled.")
+    if not ideal:
+        return TimingReport(name, 0, 0.0, 0.0, 0.0, 0.0, 0.0)
+    lateness = [a - i for a, i in zip(actual, ideal)]
+    ranked = sorted(lateness)
+    p99 = ranked[min(len(ranked) - 1, math.ceil(0.99 * len(ranked)) - 1)]
+    return TimingReport(
+        name, len(lateness), sum(lateness) / len(lateness), p99, ranked[-1],
+        lateness[-1] - lateness[0], len(lateness) / elapsed if elapsed > 0 else float('inf'),
+    )
+
+def _measure(name, play, ideal, clock, sleep, cost):
+    """Runs play(output, clock, sleep) with its text output discarded and reports its timing."""
+    import io
+    from contextlib import redirect_stdout
+
+    sink = RecordingSink(clock, cost)
+    with redirect_stdout(io.StringIO()):
+        wall = time.perf_counter()
+        origin = clock()
+        play(sink, clock, sleep)
+        elapsed = time.perf_counter() - wall
+    return timing_report(name, ideal, [t - origin for t in sink.times], elapsed)
+
+def benchmark_sequence(sequence, clock=time.perf_counter, sleep=time.sleep, cost=0.0, name=None):
+    """Measures execute_sequence against the sequence's own fire times."""
+    sequence = as_sequence(sequence)
+    return _measure(
+        name or f"sequence x{sequence.num_beeps}",
+        lambda output, clock, sleep: execute_sequence(
+            sequence, 0.0, output, clock, sleep, telemetry=PlaybackTelemetry()),
+        sequence.fire_times, clock, sleep, cost,
+    )
+
+def benchmark_morse(text, wpm, clock=time.perf_counter, sleep=time.sleep, cost=0.0, name=None):
+    """Measures execute_morse_sequence against the compiled plan's tone starts."""
+    return _measure(
+        name or f"morse {len(text)} chars @ {wpm} WPM",
+        lambda output, clock, sleep: execute_morse_sequence(
+            text, wpm, output, clock, sleep, telemetry=PlaybackTelemetry()),
+        compile_morse_plan(text, wpm).starts, clock, sleep, cost,
+    )
+
+def run_benchmarks(fake=True, cost=0.0):
+    """
+    Runs sequences and Morse messages of increasing length and speed. The fake
+    clock mode needs no real sleeping and gives identical numbers every time;
+    real mode uses shorter runs since it plays them out in real time.
+    """
+    if fake:
+        lengths, interval, words, speeds = (10, 100, 1000, 10000), 0.25, (1, 10, 100), (20, 40, 60)
+    else:
+        lengths, interval, words, speeds = (10, 50, 200), 0.01, (1, 4), (40, 80)
+
+    reports = []
+    for length in lengths:
+        clock = FakeClock() if fake else time.perf_counter
+        sleep = clock.sleep if fake else time.sleep
+        reports.append(benchmark_sequence(Sequence(0.0, length, [interval] * (length - 1)), clock, sleep, cost))
+    for count in words:
+        for wpm in speeds:
+            clock = FakeClock() if fake else time.perf_counter
+            sleep = clock.sleep if fake else time.sleep
+            reports.append(benchmark_morse("PARIS " * count, wpm, clock, sleep, cost))
+    return reports
+
+def check_benchmarks(reports, lateness=BENCH_LATENESS_LIMIT, drift=BENCH_DRIFT_LIMIT):
+    """Returns a description of every report whose mean, p99 or drift is out of bounds."""
+    failures = []
+    for r in reports:
+        for label, value, limit in (("mean", r.mean_lateness, lateness),
+                                    ("p99", r.p99_lateness, lateness),
+                                    ("drift", r.drift, drift)):
+            if abs(value) > limit:
+                failures.append(f"{r.name}: {label} {value * 1000:.3f} ms exceeds {limit * 1000:.3f} ms")
+    return failures
+
+def print_benchmarks(reports):
+    print(f"{'run':<32} {'events':>7} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9} {'drift ms':>9} {'events/s':>11}")
+    for r in reports:
+        print(f"{r.name:<32} {r.events:>7} {r.mean_lateness * 1000:>9.3f} {r.p99_lateness * 1000:>9.3f} "
+              f"{r.max_lateness * 1000:>9.3f} {r.drift * 1000:>9.3f} {r.throughput:>11.0f}")
+
+
+# --- Concurrent Playback ---
+
+class PlaybackRun:
+    """
+    One sequence or Morse transmission playing on an event loop. Fire offsets
+    are scheduled against loop.time() from a single start point, pausing
+    shifts that start point, and awaiting the run waits for it to finish.
+    Must be created, paused, resumed and cancelled from the loop's thread.
+    Each event's timing goes to telemetry unless it is None.
+    """
+
+    def __init__(self, run_id, name, offsets, lengths, total, output, position=0.0, telemetry=TELEMETRY):
+        import asyncio
+        self.id = run_id
+        self.name = name
+        self.offsets = offsets
+        self.lengths = lengths
+        self.total = total
+        self.output = output
+        self.telemetry = telemetry
+        self.paused = False
+        self.fired = bisect_left(offsets, position)
+        self._position = position
+        self._start = None
+        self._wake = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self.task = self._loop.create_task(self._play())
+
+    @property
+    def state(self):
+        if self.task.cancelled():
+            return "cancelled"
+        if self.task.done():
+            return "finished"
+        return "paused" if self.paused else "playing"
+
+    @property
+    def position(self):
+        """Seconds into the run (safe to read from any thread)."""
+        if self.paused or self._start is None or self.task.done():
+            return self._position
+        return min(self._loop.time() - self._start, self.total)
+
+    def pause(self):
+        if not self.paused:
+            self._position = self.position # Frozen here until resumed
+        self.paused = True
+        self._wake.set()
+
+    def resume(self):
+        self.paused = False
+        self._wake.set()
+
+    def cancel(self):
+        self.task.cancel()
+
+    def __await__(self):
+        return self.task.__await__()
+
+    async def _play(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        offsets = self.offsets
+        self._start = loop.time() - self._position
+        try:
+            while True:
+                if self.paused:
+                    while self.paused:
+                        self._wake.clear()
+                        await self._wake.wait()
+                    self._start = loop.time() - self._position
+
+                done = self.fired >= len(offsets)
+                deadline = self._start + (self.total if done else offsets[self.fired])
+                delay = deadline - loop.time()
+                if delay > 0:
+                    # Sleep until the deadline, but wake early if paused. Unlike
+                    # wait_for, asyncio.wait never swallows a cancel that lands
+                    # in the same tick as the wake-up.
+                    self._wake.clear()
+                    waiter = loop.create_task(self._wake.wait())
+                    try:
+                        await asyncio.wait((waiter,), timeout=delay)
+                    finally:
+                        waiter.cancel()
+                    continue
+
+                if done:
+                    break
+                fired = loop.time()
+                self.output.tone(self.lengths[self.fired])
+                if self.telemetry is not None:
+                    self.telemetry.record(fired - deadline, io_seconds=loop.time() - fired)
+                self.fired += 1
+        finally:
+            if not self.paused: # A paused run's position was recorded by pause()
+                self._position = min(loop.time() - self._start, self.total)
+
+class AsyncPlayer:
+    """
+    Plays any number of runs concurrently on the running event loop. Finished
+    runs stay in `runs` for inspection unless keep_finished is False, as in
+    the long-running daemon. Runs record their timing to telemetry.
+    """
+
+    def __init__(self, output=None, keep_finished=True, telemetry=TELEMETRY):
+        self.output = output or BellOutput()
+        self.keep_finished = keep_finished
+        self.telemetry = telemetry
+        self.runs = {}
+        self._next_id = 1
+
+    def play(self, name, offsets, lengths, total, position=0.0):
+        run = PlaybackRun(self._next_id, name, offsets, lengths, total, self.output, position, self.telemetry)
+        self.runs[run.id] = run
+        self._next_id += 1
+        if not self.keep_finished:
+            run.task.add_done_callback(lambda task, run_id=run.id: self.runs.pop(run_id, None))
+        return run
+
+    def play_sequence(self, sequence, position=0.0, name="Sequence"):
+        sequence = as_sequence(sequence)
+        return self.play(name, sequence.fire_times, beep_lengths(sequence), sequence.total, position)
+
+    def play_morse(self, text, wpm, name=None, profile=STANDARD_PROFILE, table=ITU_TABLE):
+        plan = compile_morse_plan(text, wpm, profile, table)
+        return self.play(name or f"Morse '{text[:20]}' @ {wpm} WPM", plan.starts, plan.durations[1::2], plan.total)
+
+class BackgroundPlayer:
+    """
+    Hosts an AsyncPlayer on an event loop in a daemon thread, so a blocking
+    caller like the menu can start, pause, resume and stop runs without waiting.
+    """
+
+    def __init__(self):
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self.player = AsyncPlayer()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="beep-player", daemon=True)
+        self.thread.start()
+
+    def _call(self, fn, *args, **kwargs):
+        """Runs fn on the loop thread and returns its result."""
+        import asyncio
+        async def call():
+            return fn(*args, **kwargs)
+        return asyncio.run_coroutine_threadsafe(call(), self.loop).result()
+
+    def play_sequence(self, sequence, position=0.0, name="Sequence"):
+        return self._call(self.player.play_sequence, sequence, position, name)
+
+    def play_morse(self, text, wpm, profile=STANDARD_PROFILE, table=ITU_TABLE):
+        return self._call(self.player.play_morse, text, wpm, None, profile, table)
+
+    def get(self, run_id):
+        return self.player.runs.get(run_id)
+
+    def runs(self):
+        return list(self.player.runs.values())
+
+    def pause(self, run):
+        self.loop.call_soon_threadsafe(run.pause)
+
+    def resume(self, run):
+        self.loop.call_soon_threadsafe(run.resume)
+
+    def cancel(self, run):
+        self.loop.call_soon_threadsafe(run.cancel)
+
+    def wait(self, run, timeout=None):
+        """Blocks until the run finishes or is cancelled."""
+        import asyncio
+        async def finished():
+            await asyncio.wait([run.task])
+        asyncio.run_coroutine_threadsafe(finished(), self.loop).result(timeout)
+
+    def close(self):
+        for run in self.runs():
+            self.cancel(run)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+def background_playback(player, current_sequence):
+    """Interactive control panel for runs playing in the background."""
+    while True:
+        print("\n--- 8. BACKGROUND PLAYBACK ---")
+        runs = player.runs()
+        if runs:
+            for run in runs:
+                print(f"  [{run.id}] {run.name:<32} {run.state:<9} "
+                      f"{run.position:7.2f}s / {run.total:.2f}s  ({run.fired}/{len(run.offsets)} fired)")
+        else:
+            print("  No runs yet.")
+
+        action = input(
+            "\n(S)tart current sequence, (M)orse, (P)ause, (R)esume, (C)ancel, "
+            "Enter to refresh, (B)ack: "
+        ).strip().upper()
+
+        if action == 'B':
+            return
+        if action == '':
+            continue
+        if action == 'S':
+            if current_sequence:
+                run = player.play_sequence(current_sequence)
+                print(f"\nStarted run {run.id}.")
+            else:
+                print("\n[ERROR] No sequence loaded.")
+        elif action == 'M':
+            text = input("Enter text to translate (A-Z, 0-9, limited punctuation): ").upper()
+            wpm = get_valid_int("Enter playback speed (Words Per Minute, e.g., 20 WPM): ", min_val=5)
+            run = player.play_morse(text, wpm, *get_morse_options(wpm))
+            print(f"\nStarted run {run.id}.")
+        elif action in ('P', 'R', 'C'):
+            run = player.get(get_valid_int("Run number: "))
+            if run is None:
+                print("\n[ERROR] No such run.")
+            elif action == 'P':
+                player.pause(run)
+            elif action == 'R':
+                player.resume(run)
+            else:
+                player.cancel(run)
+        else:
+            print(f"\n[ERROR] Invalid choice '{action}'.")
+
+
+# --- Scheduler Daemon ---
+
+# Longest the daemon sleeps before re-checking the wall clock, in case it was adjusted
+DAEMON_MAX_SLEEP = 300.0
+# Shortest repeat interval; anything tighter would keep the daemon busy
+DAEMON_MIN_EVERY = 1.0
+
+class ScheduledJob:
+    """A beep sequence (by library name) or Morse message due at a wall-clock time."""
+    __slots__ = ("id", "due", "kind", "target", "wpm", "every", "cancelled")
+
+    def __init__(self, job_id, due, kind, target, wpm=20, every=None):
+        self.id = job_id
+        self.due = due
+        self.kind = kind
+        self.target = target
+        self.wpm = wpm
+        self.every = every
+        self.cancelled = False
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "due": self.due,
+            "kind": self.kind,
+            "target": self.target,
+            "wpm": self.wpm,
+            "every": self.every,
+        }
+
+def parse_when(value):
+    """
+    Turns an enqueue time into epoch seconds. Accepts epoch seconds, an ISO
+    datetime, or 'HH:MM[:SS]' meaning the next time the clock shows it.
+    """
+    from datetime import datetime, timedelta
+
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    now = datetime.now()
+    for fmt in ("%H:%M", "%H:%M:%S"):
+        try:
+            clock = datetime.strptime(value, fmt).time()
+        except ValueError:
+            continue
+        when = datetime.combine(now.date(), clock)
+        if when <= now:
+            when += timedelta(days=1)
+        return when.timestamp()
+
+    return datetime.fromisoformat(value).timestamp()
+
+class BeepScheduler:
+    """
+    Timed jobs in a heap ordered by due time. The run loop only wakes for the
+    earliest job (or when the queue changes), so thousands of idle jobs cost
+    nothing. Cancelled jobs are flagged and dropped when they reach the top.
+    """
+
+    def __init__(self, player, library):
+        import asyncio
+        self.player = player
+        self.library = library
+        self.heap = []
+        self.jobs = {}
+        self._next_id = 1
+        self._changed = asyncio.Event()
+
+    def enqueue(self, due, kind, target, wpm=20, every=None):
+        if not isinstance(target, str):
+            raise ValueError("Job target must be a string.")
+        if not math.isfinite(due):
+            raise ValueError("Due time must be a finite number.")
+        if kind == "sequence":
+            if self.library.load(target) is None:
+                raise ValueError(f"No sequence named '{target}' in the library.")
+        elif kind == "morse":
+            if wpm < 5:
+                raise ValueError("WPM must be 5 or greater.")
+        else:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        if every is not None and not (math.isfinite(every) and every >= DAEMON_MIN_EVERY):
+            raise ValueError(f"Repeat interval must be at least {DAEMON_MIN_EVERY:g} seconds.")
+
+        job = ScheduledJob(self._next_id, due, kind, target, wpm, every)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        heapq.heappush(self.heap, (job.due, job.id, job))
+        if self.heap[0][2] is job:
+            self._changed.set() # New earliest job: re-arm the sleep
+        return job
+
+    def cancel(self, job_id):
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            return False
+        job.cancelled = True
+        return True
+
+    def list(self):
+        return sorted(self.jobs.values(), key=lambda job: (job.due, job.id))
+
+    def _fire(self, job):
+        stamp = time.strftime("%H:%M:%S")
+        if job.kind == "sequence":
+            sequence = self.library.load(job.target)
+            if sequence is None:
+                print(f"[{stamp}] Job {job.id}: sequence '{job.target}' no longer exists.")
+                return
+            self.player.play_sequence(sequence, name=job.target)
+        else:
+            self.player.play_morse(job.target, job.wpm)
+        print(f"[{stamp}] Job {job.id}: playing {job.kind} '{job.target}'.")
+
+    async def run(self):
+        import asyncio
+        while True:
+            # Lazily discard cancelled jobs sitting at the top of the heap
+            while self.heap and self.heap[0][2].cancelled:
+                heapq.heappop(self.heap)
+
+            timeout = None
+            if self.heap:
+                timeout = min(self.heap[0][0] - time.time(), DAEMON_MAX_SLEEP)
+            if timeout is None or timeout > 0:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due, _, job = heapq.heappop(self.heap)
+            self._fire(job)
+            if job.every:
+                # Skip any periods missed while asleep instead of firing them all at once
+                now = time.time()
+                job.due = due + job.every
+                if job.due <= now:
+                    job.due += math.ceil((now - job.due) / job.every) * job.every
+                heapq.heappush(self.heap, (job.due, job.id, job))
+            else:
+                del self.jobs[job.id]
+
+    def handle(self, request):
+        """Executes one control request and returns the response."""
+        if not isinstance(request, dict):
+            raise ValueError("Requests must be JSON objects.")
+        command = request.get("cmd")
+        if command == "enqueue":
+            if "sequence" in request:
+                kind, target = "sequence", request["sequence"]
+            else:
+                kind, target = "morse", request["morse"]
+            if not isinstance(target, str):
+                raise ValueError(f"'{kind}' must be a string.")
+            if kind == "morse":
+                target = target.upper()
+            every = request.get("every")
+            wpm = float(request.get("wpm", 20))
+            if not math.isfinite(wpm):
+                raise ValueError("WPM must be a finite number.")
+            job = self.enqueue(
+                parse_when(request.get("at", time.time())), kind, target,
+                int(wpm), float(every) if every is not None else None,
+            )
+            return {"ok": True, "job": job.to_dict()}
+        if command == "cancel":
+            return {"ok": self.cancel(int(request["id"]))}
+        if command == "list":
+            return {"ok": True, "jobs": [job.to_dict() for job in self.list()]}
+        raise ValueError(f"Unknown command '{command}'.")
+
+    async def serve_client(self, reader, writer):
+        """Answers newline-delimited JSON requests on one control connection."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = self.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError, OverflowError) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+async def _daemon_main(socket_path, library_path):
+    import asyncio
+    with SequenceLibrary(library_path) as library:
+        scheduler = BeepScheduler(AsyncPlayer(keep_finished=False), library)
+        if os.path.exists(socket_path):
+            os.remove(socket_path) # Left behind by a previous run
+        server = await asyncio.start_unix_server(scheduler.serve_client, path=socket_path)
+        print(f"Beep daemon listening on {socket_path}. Press Ctrl+C to stop.")
+        try:
+            async with server:
+                await scheduler.run()
+        finally:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+def run_daemon(socket_path=DAEMON_SOCKET, library_path=LIBRARY_FILENAME):
+    """Runs the scheduler daemon in the foreground until interrupted."""
+    import asyncio
+    try:
+        asyncio.run(_daemon_main(socket_path, library_path))
+    except KeyboardInterrupt:
+        print("\nBeep daemon stopped.")
+
+def send_daemon_command(request, socket_path=DAEMON_SOCKET, timeout=5.0):
+    """Sends one request to a running daemon and returns its decoded response."""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile('r') as f:
+            return json.loads(f.readline())
+
+
+def main_menu():
+    """The main application loop and menu system with TUI."""
+    current_sequence = None
+    paused_at = None # Where an interrupted run of the current sequence stopped
+    player = None    # Started on first use of background playback
+    
+    while True:
+        # Clear screen placeholder (print many newlines)
+        print('\n' * 50) 
+
+        # TUI Header and Status
+        print("╔═════════════════════════════════════════════════════════════╗")
+        print("║          TCore PC Speaker Sequence Controller (TUI)         ║")
+        print("╠═════════════════════════════════════════════════════════════╣")
+        
+        if current_sequence:
+            status = f"STATUS: Active Sequence - {current_sequence.num_beeps} total beeps."
+        else:
+            status = "STATUS: No sequence loaded."
+
+        print(f"║ {status:<57} ║")
+        print("╠═════════════════════════════════════════════════════════════╣")
+        
+        # Menu Options
+        print("║ 1. Create New Sequence (Interactive Input)                  ║")
+        print(f"║ 2. Save Current Sequence to library ({LIBRARY_FILENAME})       ║")
+        print(f"║ 3. Load Sequence from library ({LIBRARY_FILENAME})             ║")
+        print("║ 4. RUN Custom Sequence                                      ║")
+        print("║ 5. Create RANDOM Sequence (Surprise!)                       ║")
+        print("║ 6. Text-to-Morse Speaker (Experimental)                     ║")
+        print("║ 7. Render Sequence or Morse to WAV file                     ║")
+        print("║ 8. Background Playback (several runs at once)               ║")
+        print("║ 9. Playback Telemetry (lateness, missed deadlines)          ║")
+        print("║ 10. Exit                                                    ║")
+        print("╚═════════════════════════════════════════════════════════════╝")
+        
+        choice = input("\n[ACTION] Enter choice (1-10) and press Enter: ")
+        
+        print("\n" + "="*70) # Separator for action output
+
+        # Handle user choice
+        if choice == '1':
+            current_sequence = create_new_sequence()
+            paused_at = None
+            input("\n[PAUSE] Press Enter to return to the menu...")
+        
+        elif choice == '2':
+            save_to_library(current_sequence)
+            input("\n[PAUSE] Press Enter to return to the menu...")
+            
+        elif choice == '3':
+            loaded_seq = load_from_library()
+            if loaded_seq:
+                current_sequence = loaded_seq
+                paused_at = None
+            input("\n[PAUSE] Press Enter to return to the menu...")
+                
+        elif choice == '4':
+            if current_sequence:
+                position = 0.0
+                if paused_at is not None:
+                    answer = input(f"Resume from {paused_at:.2f}s? (Y/n): ").strip().lower()
+                    if answer in ('', 'y', 'yes'):
+                        position = paused_at
+                paused_at = execute_sequence(current_sequence, position)
+            else:
+                print("\n[ERROR] Cannot run. Please create (1), load (3), or randomize (5) a sequence first.")
+            input("\n[PAUSE] Press Enter to return to the menu...")
+
+        elif choice == '5':
+            current_sequence = create_random_sequence()
+            paused_at = None
+            input("\n[PAUSE] Press Enter to return to the menu...")
+
+        elif choice == '6':
+            # New Morse Code function
+            text_to_morse_speaker()
+            input("\n[PAUSE] Press Enter to return to the menu...")
+
+        elif choice == '7':
+            render_to_wav(current_sequence)
+            input("\n[PAUSE] Press Enter to return to the menu...")
+
+        elif choice == '8':
+            if player is None:
+                player = BackgroundPlayer()
+            background_playback(player, current_sequence)
+
+        elif choice == '9':
+            show_telemetry()
+            input("\n[PAUSE] Press Enter to return to the menu...")
+
+        elif choice == '10':
+            TELEMETRY.stop_dump()
+            if player is not None:
+                player.close()
+            print("\nExiting PC Speaker Controller. Goodbye!")
+            break
+            
+        else:
+            print(f"\n[ERROR] Invalid choice '{choice}'. Please enter a number between 1 and 10.")
+            input("\n[PAUSE] Press Enter to continue...")
+
+
+# --- Command Line ---
+
+LAUNCHER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "py-beeps.py")
+STARTUP_BUDGET = 0.05  # Seconds to the first event beyond bare interpreter startup
+COMMANDS = ("play", "morse", "render", "save", "load", "list", "convert", "daemon", "schedule",
+            "cancel", "jobs", "bench", "decode", "batch", "generate", "menu")
+
+class _FirstEventStamp(OutputBackend):
+    """Wraps an output and reports the wall-clock time of the first tone on stderr."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.stamped = False
+
+    def tone(self, duration):
+        if not self.stamped:
+            sys.stderr.write(f"first-event {time.time()!r}\n")
+            sys.stderr.flush()
+            self.stamped = True
+        self.inner.tone(duration)
+
+    def close(self):
+        self.inner.close()
+
+def measure_startup(runs=10):
+    """
+    Launches `py-beeps.py morse E` runs times and measures wall-clock time from
+    spawning the interpreter to its first event, alongside a bare `python -c pass`
+    for comparison. An untimed first run writes this module's cached bytecode,
+    as a normal installation would have. Returns (first event times, bare
+    interpreter times).
+    """
+    import subprocess
+    command = [sys.executable, LAUNCHER, "morse", "E",
+               "--output", "null", "--quiet", "--stamp-first-event"]
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    subprocess.run(command, capture_output=True, env=env)
+    times, bare = [], []
+    for _ in range(runs):
+        launched = time.time()
+        result = subprocess.run(command, capture_output=True, text=True, env=env)
+        stamps = [line.split()[1] for line in result.stderr.splitlines() if line.startswith("first-event ")]
+        if result.returncode != 0 or not stamps:
+            raise RuntimeError(f"Startup run failed: {result.stderr.strip()}")
+        times.append(float(stamps[0]) - launched)
+
+        launched = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"])
+        bare.append(time.perf_counter() - launched)
+    return sorted(times), sorted(bare)
+
+def _make_output(args):
+    """Builds the OutputBackend selected on the command line."""
+    if args.output == "wav":
+        output = WavOutput(args.wav)
+    else:
+        output = OUTPUT_BACKENDS[args.output]()
+    if getattr(args, "stamp_first_event", False):
+        output = _FirstEventStamp(output)
+    return output
+
+def _sequence_from_args(args):
+    """The sequence named with --name (from the library) or read from args.source."""
+    if args.name:
+        with SequenceLibrary(args.library) as library:
+            sequence = library.load(args.name)
+        if sequence is None:
+            raise ValueError(f"No sequence named '{args.name}' in {args.library}.")
+        return sequence
+    return read_sequence_file(args.source)
+
+def _text_from_args(words):
+    """Joins text arguments; a lone '-' reads the text from stdin."""
+    if words == ['-']:
+        return sys.stdin.read()
+    return ' '.join(words)
+
+def _cmd_play(args):
+    with _make_output(args) as output:
+        paused_at = execute_sequence(_sequence_from_args(args), args.start, output, quiet=args.quiet)
+    if paused_at is not None:
+        print(f"Resume with: --from {paused_at:.3f}", file=sys.stderr)
+        return 130
+
+def _morse_options(args):
+    """The (profile, table) chosen with --profile, --farnsworth and --table."""
+    return get_timing_profile(args.profile, args.farnsworth), get_code_table(args.table)
+
+def _cmd_morse(args):
+    profile, table = _morse_options(args)
+    with _make_output(args) as output:
+        execute_morse_sequence(_text_from_args(args.text), args.wpm, output, quiet=args.quiet,
+                               profile=profile, table=table)
+
+def _cmd_render(args):
+    tone = {"frequency": args.frequency, "sample_rate": args.sample_rate}
+    start = time.perf_counter()
+    profile, table = _morse_options(args)
+    skipped = {}
+
+    def count_unknown(char):
+        skipped[char] = skipped.get(char, 0) + 1
+
+    if args.morse is not None:
+        durations = morse_duration_stream((_text_from_args(args.morse),), args.wpm, profile, table, count_unknown)
+        seconds = write_pcm_stream(pcm_block_stream(durations, **tone), args.out, args.sample_rate) / args.sample_rate
+    elif args.text_file is not None:
+        seconds = stream_morse_file(args.text_file, args.wpm, args.out, profile, table, count_unknown, **tone)
+    else:
+        durations = sequence_durations(_sequence_from_args(args))
+        seconds = write_pcm_stream(pcm_block_stream(durations, **tone), args.out, args.sample_rate) / args.sample_rate
+    if skipped:
+        print(skipped_summary(sorted(skipped.items(), key=lambda item: -item[1])), file=sys.stderr)
+    if args.out != '-':
+        print(f"Rendered {seconds:.2f}s of audio to {args.out} in {(time.perf_counter() - start) * 1000:.1f} ms.")
+
+def _cmd_save(args):
+    sequence = read_sequence_file(args.source)
+    tags = [tag.strip() for tag in args.tags.split(',') if tag.strip()] if args.tags is not None else None
+    with SequenceLibrary(args.library) as library:
+        library.save(args.name, sequence, tags)
+    print(f"Sequence '{args.name}' saved to {args.library}")
+
+def _cmd_load(args):
+    with SequenceLibrary(args.library) as library:
+        sequence = library.load(args.name)
+    if sequence is None:
+        raise ValueError(f"No sequence named '{args.name}' in {args.library}.")
+    if args.out == '-':
+        json.dump(sequence.to_dict(), sys.stdout, indent=4)
+        print()
+    elif args.out.endswith(".beeps"):
+        save_sequence_binary(sequence, args.out)
+    else:
+        with open(args.out, 'w') as f:
+            json.dump(sequence.to_dict(), f, indent=4)
+
+def _cmd_list(args):
+    with SequenceLibrary(args.library) as library:
+        for info in library.list(args.tag, args.prefix, args.limit):
+            tags = f" [{', '.join(info.tags)}]" if info.tags else ""
+            print(f"{info.name}\t{info.num_beeps} beeps\t{info.total_seconds:.2f}s{tags}")
+
+def _cmd_convert(args):
+    if is_binary_sequence(args.source):
+        count = binary_to_json(args.source, args.dest)
+    else:
+        count = json_to_binary(args.source, args.dest)
+    print(f"Converted {args.source} -> {args.dest} ({count} beeps).")
+
+def _cmd_daemon(args):
+    run_daemon(args.socket, args.library)
+
+def _daemon_request(args, request):
+    response = send_daemon_command(request, args.socket)
+    if not response.get("ok"):
+        raise ValueError(response.get("error", "The daemon refused the request."))
+    return response
+
+def _cmd_schedule(args):
+    request = {"cmd": "enqueue", "at": args.at or time.time(), "wpm": args.wpm}
+    if args.sequence is not None:
+        request["sequence"] = args.sequence
+    else:
+        request["morse"] = args.morse
+    if args.every is not None:
+        request["every"] = args.every
+    job = _daemon_request(args, request)["job"]
+    print(f"Job {job['id']} scheduled for {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(job['due']))}.")
+
+def _cmd_cancel(args):
+    _daemon_request(args, {"cmd": "cancel", "id": args.id})
+    print(f"Job {args.id} cancelled.")
+
+def _cmd_jobs(args):
+    for job in _daemon_request(args, {"cmd": "list"})["jobs"]:
+        due = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(job['due']))
+        every = f" every {job['every']:g}s" if job['every'] else ""
+        print(f"{job['id']}\t{due}\t{job['kind']} '{job['target']}'{every}")
+
+def _cmd_bench(args):
+    if args.startup:
+        times, bare = measure_startup(args.runs)
+        overhead = times[len(times) // 2] - bare[len(bare) // 2]
+        print(f"Startup to first event over {len(times)} runs: median {times[len(times) // 2] * 1000:.1f} ms, "
+              f"max {times[-1] * 1000:.1f} ms; bare interpreter {bare[len(bare) // 2] * 1000:.1f} ms.")
+        print(f"Overhead {overhead * 1000:.1f} ms (budget {STARTUP_BUDGET * 1000:.0f} ms): "
+              f"{'OK' if overhead <= STARTUP_BUDGET else 'OVER BUDGET'}")
+        return 0 if overhead <= STARTUP_BUDGET else 1
+    if args.decode:
+        failures = 0
+        # A sender drifting away from a right first guess, one far faster than
+        # the guess, and one fading to a fifth of its starting level
+        for wpm, guess, fade, noise in (((15, 40), None, 1.0, 0.1), ((40, 60), 20, 1.0, 0.1), ((20, 25), None, 0.2, 0.02)):
+            audio, cpu, factor, exact = benchmark_decoder(wpm=wpm, guess=guess, fade=fade, noise=noise)
+            faded = f", fading to {fade:.0%}" if fade != 1.0 else ""
+            print(f"{wpm[0]}-{wpm[1]} WPM from a {guess or wpm[0]} WPM guess{faded}: decoded {audio:.1f}s "
+                  f"of audio in {cpu:.3f}s CPU ({factor:.0f}x realtime, {'exact' if exact else 'with errors'}).")
+            failures += not exact
+        return 1 if failures else 0
+    reports = run_benchmarks(fake=not args.real)
+    print_benchmarks(reports)
+    if args.real:
+        return 0 # Real timing depends on the machine; only the fake clock is held to bounds
+    failures = check_benchmarks(reports)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+def _cmd_decode(args):
+    decode_wav(args.source, args.wpm, on_text=lambda text: print(text, end='', flush=True),
+               table=get_code_table(args.table))
+    print()
+
+def _cmd_batch(args):
+    return 1 if run_batch(args.manifest, args.workers) else 0
+
+def _wpm(value):
+    """Parses a speed, held to the same 5 WPM minimum as the menu and the daemon."""
+    import argparse
+    wpm = int(value)
+    if wpm < 5:
+        raise argparse.ArgumentTypeError("WPM must be 5 or greater")
+    return wpm
+
+def _at_least(convert, minimum, strict=False):
+    """An argument type that converts and then rejects values below minimum
+    (or equal to it, when strict)."""
+    import argparse
+    import math
+
+    def parse(value):
+        number = convert(value)
+        if not math.isfinite(number) or number < minimum or (strict and number == minimum):
+            raise argparse.ArgumentTypeError(f"must be {'greater than' if strict else 'at least'} {minimum}")
+        return number
+    return parse
+
+def _distribution(value):
+    """Parses 'name,param,param' into a distribution tuple."""
+    import argparse
+    import math
+    name, *params = value.split(',')
+    if name not in DISTRIBUTIONS:
+        raise argparse.ArgumentTypeError(f"unknown distribution '{name}', expected one of {', '.join(DISTRIBUTIONS)}")
+    if len(params) != DISTRIBUTIONS[name]:
+        raise argparse.ArgumentTypeError(f"'{name}' takes {DISTRIBUTIONS[name]} parameter(s)")
+    try:
+        params = [float(p) for p in params]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad parameters in '{value}'") from None
+    if not all(map(math.isfinite, params)):
+        raise argparse.ArgumentTypeError(f"bad parameters in '{value}'")
+    return (name, *params)
+
+def _cmd_generate(args):
+    options = {"beats": (args.min_beats, args.max_beats), "wait": args.wait, "delay": args.delay}
+    if args.binary is not None:
+        generate_to_binary(args.binary, args.count, args.seed, **options)
+        print(f"Wrote {args.count} sequences to {args.binary}.")
+    else:
+        with SequenceLibrary(args.library) as library:
+            generate_to_library(library, args.count, args.seed, **options)
+        print(f"Saved {args.count} sequences to {args.library}.")
+
+def build_parser(only=None):
+    """
+    The argument parser. When only names a subcommand, the other subcommands
+    are left out, which keeps startup short for one-shot invocations.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="py-beeps.py",
+        description="PC speaker sequences and Morse code. Run without arguments for the interactive menu.",
+    )
+    parser.add_argument("--library", default=LIBRARY_FILENAME, help="sequence library file")
+    parser.add_argument("--telemetry", metavar="FILE", help="dump playback telemetry to FILE as JSON")
+    parser.add_argument("--telemetry-interval", type=float, default=TELEMETRY_DUMP_INTERVAL, metavar="SECONDS")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    def wanted(name):
+        return only is None or only == name
+
+    def command(name, handler, help):
+        sub = commands.add_parser(name, help=help)
+        sub.set_defaults(handler=handler)
+        return sub
+
+    def add_morse(sub):
+        sub.add_argument("--wpm", type=_wpm, default=20, help="character speed")
+        sub.add_argument("--farnsworth", type=int, metavar="WPM", help="overall speed, with wider gaps")
+        sub.add_argument("--profile", help="timing profile name or JSON file")
+        sub.add_argument("--table", help="code table name or JSON file")
+
+    def add_output(sub):
+        sub.add_argument("--output", choices=sorted(OUTPUT_BACKENDS), default="bell")
+        sub.add_argument("--wav", default=WAV_FILENAME, help="file for --output wav")
+        sub.add_argument("--quiet", action="store_true", help="no per-beep text")
+        sub.add_argument("--stamp-first-event", action="store_true", help=argparse.SUPPRESS)
+
+    if wanted("play"):
+        sub = command("play", _cmd_play, "play a sequence from a file, stdin or the library")
+        sub.add_argument("source", nargs='?', default='-', help="JSON or binary sequence file, '-' for stdin")
+        sub.add_argument("--name", help="play this library sequence instead")
+        sub.add_argument("--from", dest="start", type=_at_least(float, 0), default=0.0, metavar="SECONDS", help="start position")
+        add_output(sub)
+
+    if wanted("morse"):
+        sub = command("morse", _cmd_morse, "play text as Morse code")
+        sub.add_argument("text", nargs='+', help="text to send, '-' for stdin; <AR> sends a prosign")
+        add_morse(sub)
+        add_output(sub)
+
+    if wanted("render"):
+        sub = command("render", _cmd_render, "render a sequence or Morse to WAV ('-o -' for raw PCM)")
+        sub.add_argument("source", nargs='?', default='-', help="sequence file, '-' for stdin")
+        sub.add_argument("--name", help="render this library sequence")
+        sub.add_argument("--morse", nargs='+', metavar="TEXT", help="render this text as Morse")
+        sub.add_argument("--text-file", help="render this text file as Morse")
+        sub.add_argument("-o", "--out", default=WAV_FILENAME)
+        add_morse(sub)
+        sub.add_argument("--frequency", type=_at_least(float, 0, strict=True), default=DEFAULT_TONE_HZ)
+        sub.add_argument("--sample-rate", type=_at_least(int, 0, strict=True), default=DEFAULT_SAMPLE_RATE)
+
+    if wanted("save"):
+        sub = command("save", _cmd_save, "store a sequence file in the library")
+        sub.add_argument("name")
+        sub.add_argument("source", nargs='?', default='-', help="sequence file, '-' for stdin")
+        sub.add_argument("--tags", help="comma separated tags")
+
+    if wanted("load"):
+        sub = command("load", _cmd_load, "write a library sequence as JSON (or .beeps binary)")
+        sub.add_argument("name")
+        sub.add_argument("-o", "--out", default='-')
+
+    if wanted("list"):
+        sub = command("list", _cmd_list, "list library sequences")
+        sub.add_argument("--tag")
+        sub.add_argument("--prefix", help="only names starting with this")
+        sub.add_argument("--limit", type=_at_least(int, 1), help="list at most this many")
+
+    if wanted("convert"):
+        sub = command("convert", _cmd_convert, "convert a sequence between JSON and binary")
+        sub.add_argument("source")
+        sub.add_argument("dest")
+
+    if wanted("daemon"):
+        sub = command("daemon", _cmd_daemon, "run the scheduler daemon")
+        sub.add_argument("--socket", default=DAEMON_SOCKET)
+
+    if wanted("schedule"):
+        sub = command("schedule", _cmd_schedule, "schedule a job on the daemon")
+        target = sub.add_mutually_exclusive_group(required=True)
+        target.add_argument("--sequence", help="library sequence name")
+        target.add_argument("--morse", help="Morse text")
+        sub.add_argument("--at", help="epoch seconds, ISO datetime or HH:MM (default now)")
+        sub.add_argument("--every", type=_at_least(float, DAEMON_MIN_EVERY), metavar="SECONDS", help="repeat interval")
+        sub.add_argument("--wpm", type=_wpm, default=20)
+        sub.add_argument("--socket", default=DAEMON_SOCKET)
+
+    if wanted("cancel"):
+        sub = command("cancel", _cmd_cancel, "cancel a daemon job")
+        sub.add_argument("id", type=int)
+        sub.add_argument("--socket", default=DAEMON_SOCKET)
+
+    if wanted("jobs"):
+        sub = command("jobs", _cmd_jobs, "list daemon jobs")
+        sub.add_argument("--socket", default=DAEMON_SOCKET)
+
+    if wanted("bench"):
+        sub = command("bench", _cmd_bench, "timing, decoder or startup benchmarks")
+        sub.add_argument("--real", action="store_true", help="use the real clock (reported, not checked)")
+        sub.add_argument("--decode", action="store_true", help="benchmark the Morse decoder")
+        sub.add_argument("--startup", action="store_true", help="measure startup to first event")
+        sub.add_argument("--runs", type=_at_least(int, 1), default=10)
+
+    if wanted("decode"):
+        sub = command("decode", _cmd_decode, "decode Morse from a WAV file")
+        sub.add_argument("source")
+        sub.add_argument("--wpm", type=_wpm, default=20, help="starting speed estimate")
+        sub.add_argument("--table", help="code table name or JSON file")
+
+    if wanted("batch"):
+        sub = command("batch", _cmd_batch, "render a JSON-lines manifest across processes")
+        sub.add_argument("manifest")
+        sub.add_argument("--workers", type=_at_least(int, 1))
+
+    if wanted("generate"):
+        sub = command("generate", _cmd_generate, "generate random sequences into the library or binary files")
+        sub.add_argument("count", type=_at_least(int, 0))
+        sub.add_argument("--seed", type=int, required=True)
+        sub.add_argument("--binary", metavar="DIR", help="write binary files here instead of the library")
+        sub.add_argument("--min-beats", type=_at_least(int, 0), default=MIN_BEATS)
+        sub.add_argument("--max-beats", type=_at_least(int, 0), default=MAX_BEATS)
+        sub.add_argument("--wait", type=_distribution, default=DEFAULT_WAIT_DISTRIBUTION, metavar="DIST",
+                         help="e.g. uniform,0.1,5 or exponential,1")
+        sub.add_argument("--delay", type=_distribution, default=DEFAULT_DELAY_DISTRIBUTION, metavar="DIST")
+
+    if wanted("menu"):
+        command("menu", lambda args: main_menu(), "start the interactive menu")
+    return parser
+
+def main(argv=None):
+    """Command-line entry point. With no arguments, starts the interactive menu."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        main_menu()
+        return 0
+
+    only = argv[0] if argv[0] in COMMANDS else None
+    args = build_parser(only).parse_args(argv)
+    if args.command is None:
+        main_menu()
+        return 0
+
+    if args.telemetry:
+        TELEMETRY.start_dump(args.telemetry, args.telemetry_interval)
+    try:
+        return args.handler(args) or 0
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        TELEMETRY.stop_dump()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
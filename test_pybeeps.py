@@ -0,0 +1,319 @@
+"""
+Regression tests for pybeeps. Timing is checked against FakeClock, so nothing
+here sleeps for real; the decoder and bulk generation tests need NumPy.
+
+Run with:  python -m unittest test_pybeeps   (or python -m pytest)
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+import pybeeps
+from pybeeps import (
+    FakeClock, MorseDecoder, RecordingSink, Sequence, SequenceLibrary, benchmark_morse,
+    benchmark_sequence, check_benchmarks, run_benchmarks,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+needs_numpy = unittest.skipIf(numpy is None, "NumPy is not installed")
+
+
+class TimingTests(unittest.TestCase):
+
+    def test_fake_clock_benchmarks_are_within_bounds(self):
+        reports = run_benchmarks(fake=True)
+        self.assertTrue(reports)
+        self.assertEqual(check_benchmarks(reports), [])
+
+    def test_output_slower_than_the_gaps_is_a_regression(self):
+        # A dot and the gap after it last 120 ms at 20 WPM, so 300 ms per tone can't keep up
+        clock = FakeClock()
+        report = benchmark_morse("PARIS " * 10, 20, clock, clock.sleep, cost=0.3)
+        failures = check_benchmarks([report])
+        self.assertTrue(any("mean" in failure for failure in failures))
+        self.assertTrue(any("drift" in failure for failure in failures))
+
+    def test_drift_is_a_regression(self):
+        ideal = [i * 0.1 for i in range(100)]
+        drifting = [t + i * 0.00005 for i, t in enumerate(ideal)] # Relative sleeps adding up
+        report = pybeeps.timing_report("drifting", ideal, drifting, 1.0)
+        labels = [failure.split(': ')[1].split()[0] for failure in check_benchmarks([report])]
+        self.assertEqual(labels, ["mean", "p99", "drift"])
+
+    def test_sequence_fires_on_its_deadlines(self):
+        clock = FakeClock()
+        sequence = Sequence(0.5, 50, [0.25] * 49)
+        report = benchmark_sequence(sequence, clock, clock.sleep)
+        self.assertEqual(report.events, 50)
+        self.assertLess(abs(report.drift), 1e-4)
+
+    def test_recording_sink_uses_the_clock(self):
+        clock = FakeClock(start=10.0, tick=0.0)
+        sink = RecordingSink(clock, cost=0.5)
+        sink.tone(0.1)
+        sink.tone(0.1)
+        self.assertEqual(list(sink.times), [10.0, 10.5])
+
+
+class SequenceTests(unittest.TestCase):
+
+    def test_dict_round_trip(self):
+        sequence = Sequence.from_dict({"initial_wait": 1.5, "num_beeps": 3, "delays": [0.25, 0.5]})
+        self.assertEqual(sequence.to_dict(), {"initial_wait": 1.5, "num_beeps": 3, "delays": [0.25, 0.5]})
+        self.assertEqual(list(sequence.fire_times), [1.5, 1.75, 2.25])
+        self.assertEqual(sequence.index_at(1.8), 2)
+
+    def test_missing_delays_are_padded(self):
+        sequence = Sequence.from_dict({"num_beeps": 3})
+        self.assertEqual(list(sequence.delays), [pybeeps.FALLBACK_DELAY] * 2)
+
+    def test_invalid_fields_raise_value_error(self):
+        for data in ({"initial_wait": None}, {"initial_wait": -1}, {"initial_wait": "x"},
+                     {"delays": None}, {"delays": 5}, {"delays": ["a"]},
+                     {"num_beeps": 2, "delays": [-1]}, {"num_beeps": 2, "delays": [math.nan]},
+                     {"num_beeps": -1}, {"num_beeps": 1.5}, {"num_beeps": 1e12}, []):
+            with self.subTest(data=data), self.assertRaises(ValueError):
+                Sequence.from_dict(data)
+
+    def test_immutable(self):
+        sequence = Sequence(0.0, 2, [0.5])
+        with self.assertRaises(AttributeError):
+            sequence.num_beeps = 3
+        with self.assertRaises(TypeError):
+            sequence.delays[0] = 1.0
+
+
+class BinaryFormatTests(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.dir.name, name)
+
+    def test_binary_round_trip(self):
+        sequence = Sequence(0.25, 4, [0.1, 0.2, 0.3])
+        pybeeps.save_sequence_binary(sequence, self.path("s.beeps"))
+        loaded = pybeeps.load_sequence_binary(self.path("s.beeps"))
+        self.assertEqual(loaded.to_dict(), sequence.to_dict())
+
+    def test_json_binary_conversion(self):
+        data = {"initial_wait": 2.0, "num_beeps": 3, "delays": [0.5, 0.75]}
+        with open(self.path("s.json"), 'w') as f:
+            json.dump(data, f)
+        pybeeps.json_to_binary(self.path("s.json"), self.path("s.beeps"))
+        self.assertTrue(pybeeps.is_binary_sequence(self.path("s.beeps")))
+        self.assertFalse(pybeeps.is_binary_sequence(self.path("s.json")))
+        pybeeps.binary_to_json(self.path("s.beeps"), self.path("back.json"))
+        with open(self.path("back.json")) as f:
+            self.assertEqual(json.load(f), data)
+        # The format is detected from the content, whatever the file is called
+        os.rename(self.path("s.beeps"), self.path("s.txt"))
+        self.assertEqual(pybeeps.read_sequence_file(self.path("s.txt")).to_dict(), data)
+
+    def test_bad_binary_raises_value_error(self):
+        good = io.BytesIO()
+        header = pybeeps.BINARY_HEADER.pack(pybeeps.BINARY_MAGIC, pybeeps.BINARY_VERSION, 0, 0.0, 3, 2)
+        for data in (b"BEEP", b"NOPE" + header[4:] + bytes(16), header + bytes(8),
+                     header.replace(b"\x01\x00", b"\x09\x00", 1) + bytes(16)):
+            with self.subTest(data=data[:8]), self.assertRaises(ValueError):
+                pybeeps.parse_sequence_binary(data)
+        good.write(header + bytes(16))
+        self.assertEqual(pybeeps.parse_sequence_binary(good.getvalue()).num_beeps, 3)
+
+
+class LibraryTests(unittest.TestCase):
+
+    def setUp(self):
+        self.library = SequenceLibrary(":memory:")
+        self.addCleanup(self.library.close)
+
+    def test_save_load_delete(self):
+        self.library.save("one", Sequence(1.0, 3, [0.5, 0.25]), ["a", "b"])
+        self.assertEqual(self.library.load("one").to_dict(), Sequence(1.0, 3, [0.5, 0.25]).to_dict())
+        self.library.save("one", Sequence(0.0, 1))
+        self.assertEqual(self.library.load("one").num_beeps, 1)
+        self.assertEqual(self.library.list()[0].tags, ("a", "b"))   # Kept when tags is None
+        self.assertTrue(self.library.delete("one"))
+        self.assertIsNone(self.library.load("one"))
+        self.assertFalse(self.library.delete("one"))
+
+    def test_list_filters(self):
+        for name in ("alpha", "beta", "bravo", "charlie"):
+            self.library.save(name, Sequence(0.0, 1), ["b"] if name.startswith("b") else [])
+        names = lambda **kw: [info.name for info in self.library.list(**kw)]
+        self.assertEqual(names(), ["alpha", "beta", "bravo", "charlie"])
+        self.assertEqual(names(tag="b"), ["beta", "bravo"])
+        self.assertEqual(names(prefix="b"), ["beta", "bravo"])
+        self.assertEqual(names(prefix="br"), ["bravo"])
+        self.assertEqual(names(limit=2), ["alpha", "beta"])
+
+    @needs_numpy
+    def test_generated_sequences_do_not_depend_on_batch_size(self):
+        other = SequenceLibrary(":memory:")
+        self.addCleanup(other.close)
+        pybeeps.generate_to_library(self.library, 25, seed=7, batch_size=4)
+        pybeeps.generate_to_library(other, 25, seed=7, batch_size=25)
+        for info in self.library.list():
+            self.assertEqual(self.library.load(info.name).to_dict(), other.load(info.name).to_dict())
+        self.assertEqual(len(other.list(tag="random")), 25)
+
+
+@needs_numpy
+class DecoderTests(unittest.TestCase):
+
+    def render(self, text, wpm, farnsworth=None, amplitude=pybeeps.DEFAULT_AMPLITUDE):
+        plan = pybeeps.compile_morse_plan(text, wpm, pybeeps.get_timing_profile(None, farnsworth))
+        return pybeeps.render_tones(plan.durations, amplitude=amplitude).astype(numpy.float32) / 32768.0
+
+    def decode(self, pcm, chunk=pybeeps.DECODE_CHUNK_SAMPLES, wpm=20, noise=0.02):
+        pcm = pcm + numpy.random.default_rng(1).normal(0.0, noise, len(pcm)).astype(numpy.float32)
+        decoder = MorseDecoder(wpm=wpm)
+        text = ''.join(decoder.feed(pcm[i:i + chunk]) for i in range(0, len(pcm), chunk))
+        return (text + decoder.finish()).strip()
+
+    def test_round_trip(self):
+        for wpm in (10, 20, 35):
+            with self.subTest(wpm=wpm):
+                self.assertEqual(self.decode(self.render("CQ CQ DE K1ABC 73", wpm)), "CQ CQ DE K1ABC 73")
+
+    def test_farnsworth_word_gaps(self):
+        for wpm, farnsworth in ((30, 10), (20, 13), (25, 8)):
+            with self.subTest(wpm=wpm, farnsworth=farnsworth):
+                text = "HELLO WORLD I AM HERE"
+                self.assertEqual(self.decode(self.render(text, wpm, farnsworth), wpm=wpm), text)
+
+    def test_single_letter_words(self):
+        self.assertEqual(self.decode(self.render("A B C D E F G H I J", 20)), "A B C D E F G H I J")
+
+    def test_level_drop_does_not_depend_on_chunk_size(self):
+        pcm = numpy.concatenate((self.render("LOUD SIGNAL HERE ", 20),
+                                 self.render("QUIET SIGNAL NOW", 20, amplitude=0.15)))
+        for chunk in (256, 4096, 44100):
+            with self.subTest(chunk=chunk):
+                self.assertEqual(self.decode(pcm, chunk), "LOUD SIGNAL HERE QUIET SIGNAL NOW")
+
+    def test_benchmark_cases(self):
+        text = "THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG 0123456789 " * 2
+        for options in ({"wpm": (15, 40)}, {"wpm": (40, 60), "guess": 20},
+                        {"wpm": (20, 25), "fade": 0.2, "noise": 0.02}):
+            with self.subTest(**options):
+                self.assertTrue(pybeeps.benchmark_decoder(text, **options)[3])
+
+    def test_wav_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "m.wav")
+            pybeeps.render_morse_wav("SOS DE K1ABC", 25, path)
+            self.assertEqual(pybeeps.decode_wav(path, 25), "SOS DE K1ABC")
+
+
+class PlaybackRunTests(unittest.TestCase):
+
+    def run_async(self, control):
+        async def main():
+            run = pybeeps.PlaybackRun(1, "test", [0.0, 5.0], [0.1, 0.1], 6.0, pybeeps.NullOutput(), telemetry=None)
+            await asyncio.sleep(0.01)
+            await control(run)
+            try:
+                await asyncio.wait_for(asyncio.shield(run.task), 1.0)
+            except asyncio.CancelledError:
+                pass
+            return run
+        return asyncio.run(main())
+
+    def test_cancel_right_after_pause(self):
+        async def control(run):
+            run.pause()
+            run.cancel()
+        self.assertEqual(self.run_async(control).state, "cancelled")
+
+    def test_cancel_right_after_resume(self):
+        async def control(run):
+            run.pause()
+            await asyncio.sleep(0.01)
+            run.resume()
+            run.cancel()
+        self.assertEqual(self.run_async(control).state, "cancelled")
+
+
+class SchedulerTests(unittest.TestCase):
+
+    class Player:
+        def play_sequence(self, sequence, name=None):
+            pass
+
+        def play_morse(self, text, wpm):
+            pass
+
+    def setUp(self):
+        self.library = SequenceLibrary(":memory:")
+        self.addCleanup(self.library.close)
+        self.library.save("chime", Sequence(0.0, 2, [0.5]))
+        self.scheduler = pybeeps.BeepScheduler(self.Player(), self.library)
+
+    def test_enqueue_and_list(self):
+        response = self.scheduler.handle({"cmd": "enqueue", "sequence": "chime", "at": 100.0, "every": 60})
+        self.assertTrue(response["ok"])
+        self.scheduler.handle({"cmd": "enqueue", "morse": "sos", "at": 50.0})
+        jobs = self.scheduler.handle({"cmd": "list"})["jobs"]
+        self.assertEqual([job["target"] for job in jobs], ["SOS", "chime"])
+        json.dumps(jobs, allow_nan=False)
+
+    def test_bad_requests_raise_value_error(self):
+        for request in ({"cmd": "enqueue", "morse": "E", "every": "nan"},
+                        {"cmd": "enqueue", "morse": "E", "every": 0.01},
+                        {"cmd": "enqueue", "morse": "E", "at": "nan"},
+                        {"cmd": "enqueue", "morse": "E", "wpm": "inf"},
+                        {"cmd": "enqueue", "morse": "E", "wpm": 2},
+                        {"cmd": "enqueue", "morse": 5},
+                        {"cmd": "enqueue", "sequence": {"a": 1}},
+                        {"cmd": "enqueue", "sequence": "missing"},
+                        {"cmd": "bogus"}, ["cmd"]):
+            with self.subTest(request=request), self.assertRaises(ValueError):
+                self.scheduler.handle(request)
+        self.assertEqual(self.scheduler.list(), [])
+
+
+class CommandLineTests(unittest.TestCase):
+
+    def assertRejected(self, argv):
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            pybeeps.build_parser(argv[0]).parse_args(argv)
+
+    def test_invalid_options_are_rejected(self):
+        for argv in (["generate", "3", "--seed", "1", "--wait", "uniform"],
+                     ["generate", "3", "--seed", "1", "--wait", "bogus,1"],
+                     ["generate", "-5", "--seed", "1"],
+                     ["render", "--sample-rate", "0"],
+                     ["play", "--from", "-5"],
+                     ["morse", "E", "--wpm", "2"],
+                     ["schedule", "--morse", "E", "--every", "nan"]):
+            with self.subTest(argv=argv):
+                self.assertRejected(argv)
+
+    def test_distribution(self):
+        args = pybeeps.build_parser("generate").parse_args(["generate", "3", "--seed", "1", "--wait", "normal,1,0.5"])
+        self.assertEqual(args.wait, ("normal", 1.0, 0.5))
+
+    def test_play_errors_are_reported(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bad.json")
+            with open(path, 'w') as f:
+                json.dump({"delays": None}, f)
+            with redirect_stderr(io.StringIO()) as err, redirect_stdout(io.StringIO()):
+                self.assertEqual(pybeeps.main(["play", path, "--output", "null"]), 1)
+            self.assertIn("error:", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()